@@ -6,4 +6,4 @@ __email__ = "yangbai90@outlook.com"
 __status__ = "development"
 __date__ = "Dec 19, 2021"
 
-__all__=["gaussrule","shapefun"]
+__all__=["gaussrule","shapefun","assembler","geometry","structured","dirichletbc","linearsolver","transient","elasticity","newton","parallel","kernels","matrixfree"]
@@ -0,0 +1,218 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import scipy.sparse as sp
+import sys
+
+
+class assemblyplan:
+    def __init__(self,mesh,dofspernode=1):
+        """
+        Initialize the assembly plan, it generates the CSR sparsity pattern and the scatter map
+        from the element matrices to the CSR data array once, since the connectivity never changes
+
+        Parameters
+        ----------
+        mesh : mesh1d or mesh2d
+            the mesh class, createmesh() must be called before
+        dofspernode : int
+            the number of dofs on each node, i.e. 1 for poisson, 2 for 2d elasticity
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the assembly plan')
+        self.mesh=mesh
+        self.dofspernode=dofspernode
+        self.nDofs=mesh.nodes*dofspernode
+        self.elements=mesh.elements
+        self.dofsperelement=mesh.nodesperelement*dofspernode
+        self.createplan()
+    def getelementdofs(self,elementconn=None):
+        """
+        get the global dof index of each element, the dofs of one node are stored continuously, i.e. ux,uy,ux,uy...
+
+        Parameters
+        ----------
+        elementconn : array
+            the element connectivity, the bulk elements of the mesh are used if it is None
+
+        Returns
+        -------
+        elementdofs : (nElem,dofsperelement) array
+        """
+        if elementconn is None:
+            elementconn=self.mesh.elementconn
+        conn=np.asarray(elementconn,dtype=np.int64)
+        if conn.ndim==1:
+            conn=conn.reshape((1,-1))
+        ndofs=self.dofspernode
+        return (conn[:,:,None]*ndofs+np.arange(ndofs)).reshape((conn.shape[0],-1))
+    def elementkeys(self,elementdofs):
+        """
+        get the flattened (row*nDofs+col) key of each entry of the element matrices, (nElem*dofsperelement**2,)
+        """
+        rows=np.repeat(elementdofs,elementdofs.shape[1],axis=1)
+        cols=np.tile(elementdofs,(1,elementdofs.shape[1]))
+        return (rows*self.nDofs+cols).ravel()
+    def createplan(self):
+        """
+        generate the CSR sparsity pattern (indptr,indices) and the scatter map of the element matrices
+        """
+        self.elementdofs=self.getelementdofs()
+        keys,inverse=np.unique(self.elementkeys(self.elementdofs),return_inverse=True)
+        rows=keys//self.nDofs
+        cols=keys%self.nDofs
+
+        self.nnz=keys.size
+        if max(self.nDofs,self.nnz)<np.iinfo(np.int32).max:
+            self.indextype=np.int32
+        else:
+            self.indextype=np.int64
+        self.indices=cols.astype(self.indextype)
+        self.indptr=np.zeros(self.nDofs+1,dtype=self.indextype)
+        np.cumsum(np.bincount(rows,minlength=self.nDofs),out=self.indptr[1:])
+        # scatter[e,i*dofsperelement+j] is the position of Ke[e,i,j] in the CSR data array
+        self.scatter=inverse.reshape((self.elements,-1)).astype(self.indextype)
+        self.elementdofs=self.elementdofs.astype(self.indextype)
+    def getscatter(self,elements=None):
+        """
+        return the scatter map of the matrix and vector entries for the given elements
+        """
+        if elements is None:
+            return self.scatter,self.elementdofs
+        return self.scatter[elements],self.elementdofs[elements]
+    def assemblematrix(self,Ke_batch,elements=None,data=None):
+        """
+        assemble a batch of element matrices into the CSR data array
+
+        Parameters
+        ----------
+        Ke_batch : (nElem,dofsperelement,dofsperelement) array
+            the element matrices, Ke_batch[e,i,j] goes to K[elementdofs[e,i],elementdofs[e,j]]
+        elements : array
+            the element ids of the batch, all the bulk elements are used if it is None
+        data : array
+            the CSR data array to add to, a new one is created if it is None
+
+        Returns
+        -------
+        data : (nnz,) array
+        """
+        scatter,elementdofs=self.getscatter(elements)
+        Ke=np.asarray(Ke_batch,dtype=np.float64)
+        if not Ke.shape==(elementdofs.shape[0],self.dofsperelement,self.dofsperelement):
+            sys.exit('the shape of Ke_batch does not match with the mesh in assemblyplan')
+        values=np.bincount(scatter.ravel(),weights=Ke.ravel(),minlength=self.nnz)
+        if data is None:
+            return values
+        data+=values
+        return data
+    def assemblevector(self,Fe_batch,elements=None,rhs=None):
+        """
+        assemble a batch of element vectors into the global vector
+
+        Parameters
+        ----------
+        Fe_batch : (nElem,dofsperelement) array
+            the element vectors
+        elements : array
+            the element ids of the batch, all the bulk elements are used if it is None
+        rhs : array
+            the global vector to add to, a new one is created if it is None
+
+        Returns
+        -------
+        rhs : (nDofs,) array
+        """
+        scatter,elementdofs=self.getscatter(elements)
+        Fe=np.asarray(Fe_batch,dtype=np.float64)
+        if not Fe.shape==elementdofs.shape:
+            sys.exit('the shape of Fe_batch does not match with the mesh in assemblyplan')
+        values=np.bincount(elementdofs.ravel(),weights=Fe.ravel(),minlength=self.nDofs)
+        if rhs is None:
+            return values
+        rhs+=values
+        return rhs
+    def creatematrix(self,data=None):
+        """
+        return a scipy csr_matrix with the sparsity pattern of the plan, it shares the given data array
+        """
+        if data is None:
+            data=np.zeros(self.nnz)
+        return sp.csr_matrix((data,self.indices,self.indptr),shape=(self.nDofs,self.nDofs),copy=False)
+###########################################################################
+class sparseassembler:
+    def __init__(self,mesh,dofspernode=1,plan=None):
+        """
+        Initialize the sparse assembler, the CSR sparsity pattern is generated once from the mesh connectivity
+
+        Parameters
+        ----------
+        mesh : mesh1d or mesh2d
+            the mesh class, createmesh() must be called before
+        dofspernode : int
+            the number of dofs on each node, i.e. 1 for poisson, 2 for 2d elasticity
+        plan : assemblyplan
+            the assembly plan, it can be shared by several assemblers(i.e. mass and stiffness matrix)
+            of the same mesh, a new one is created if it is None
+        """
+        if plan is None:
+            plan=assemblyplan(mesh,dofspernode)
+        elif not (plan.mesh is mesh and plan.dofspernode==dofspernode):
+            sys.exit('the assembly plan does not match with the mesh or dofspernode in sparseassembler')
+        self.plan=plan
+        self.mesh=mesh
+        self.dofspernode=dofspernode
+        self.nDofs=plan.nDofs
+        self.dofsperelement=plan.dofsperelement
+        self.nnz=plan.nnz
+        self.indices=plan.indices
+        self.indptr=plan.indptr
+        self.elementdofs=plan.elementdofs
+        self.data=np.zeros(self.nnz)
+        self.rhs=np.zeros(self.nDofs)
+    def zero(self):
+        """
+        reset the values of the global matrix and the rhs vector, the sparsity pattern is kept
+        """
+        self.data[:]=0.0
+        self.rhs[:]=0.0
+    def add_element_matrices(self,Ke_batch,elements=None):
+        """
+        add a batch of element matrices to the global matrix
+
+        Parameters
+        ----------
+        Ke_batch : (nElem,dofsperelement,dofsperelement) array
+            the element matrices, Ke_batch[e,i,j] is added to K[elementdofs[e,i],elementdofs[e,j]]
+        elements : array
+            the element ids of the batch, all the bulk elements are used if it is None
+        """
+        self.plan.assemblematrix(Ke_batch,elements,self.data)
+    def add_element_vectors(self,Fe_batch,elements=None):
+        """
+        add a batch of element vectors to the global rhs vector
+
+        Parameters
+        ----------
+        Fe_batch : (nElem,dofsperelement) array
+            the element vectors
+        elements : array
+            the element ids of the batch, all the bulk elements are used if it is None
+        """
+        self.plan.assemblevector(Fe_batch,elements,self.rhs)
+    def getmatrix(self):
+        """
+        return the global matrix as scipy csr_matrix, it shares the data array with the assembler
+        """
+        return self.plan.creatematrix(self.data)
+    def getrhs(self):
+        """
+        return the global rhs vector
+        """
+        return self.rhs
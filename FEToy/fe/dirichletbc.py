@@ -0,0 +1,146 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import scipy.sparse as sp
+import sys
+
+
+class dirichletbc:
+    def __init__(self,nodes,dofspernode=1):
+        """
+        Initialize the dirichlet boundary condition class, the fixed dofs are removed from the
+        system by row/column elimination, so K keeps its symmetry and positive definiteness
+        (no penalty number is added)
+
+        Parameters
+        ----------
+        nodes : int
+            the number of nodes of the mesh
+        dofspernode : int
+            the number of dofs on each node, the dofs of one node are stored continuously
+        """
+        self.nodes=nodes
+        self.dofspernode=dofspernode
+        self.nDofs=nodes*dofspernode
+        self.fixed=np.zeros(self.nDofs,dtype=bool)
+        self.values=np.zeros(self.nDofs)
+        self.update()
+    def addbc(self,nodeids,value=0.0,dof=0):
+        """
+        add the dirichlet condition u[dof]=value on the given nodes, i.e. addbc(mesh.bcnodeids['top'],0.05,dof=1)
+
+        Parameters
+        ----------
+        nodeids : array
+            the node ids
+        value : double or array
+            the preset value, one for all the nodes or one for each node
+        dof : int
+            the local dof index of the node, i.e. 0 for ux, 1 for uy
+        """
+        if dof<0 or dof>=self.dofspernode:
+            sys.exit('dof=%d is out of range in dirichletbc->addbc'%(dof))
+        dofs=np.atleast_1d(np.asarray(nodeids,dtype=np.int64))*self.dofspernode+dof
+        self.fixed[dofs]=True
+        self.values[dofs]=value
+        self.update()
+    def setvalue(self,nodeids,value,dof=0):
+        """
+        change the preset value of the existing dirichlet nodes, i.e. for the time dependent conditions
+        """
+        dofs=np.atleast_1d(np.asarray(nodeids,dtype=np.int64))*self.dofspernode+dof
+        if not np.all(self.fixed[dofs]):
+            sys.exit('some of the nodes are not dirichlet nodes, please use addbc')
+        self.values[dofs]=value
+    def update(self):
+        """
+        update the fixed and free dof lists
+        """
+        self.fixeddofs=np.flatnonzero(self.fixed)
+        self.freedofs=np.flatnonzero(~self.fixed)
+    def getfixeddofs(self):
+        return self.fixeddofs
+    def getfreedofs(self):
+        return self.freedofs
+    def reduce(self,K,F,homogeneous=False):
+        """
+        eliminate the fixed dofs: Kff*uf=Ff-Kfc*uc
+
+        Parameters
+        ----------
+        K : sparse matrix or array
+            the global matrix
+        F : array
+            the global rhs vector
+        homogeneous : boolean
+            True to use uc=0, i.e. for the newton-raphson increment once the solution satisfies the condition
+
+        Returns
+        -------
+        Kff : sparse matrix or array
+            the reduced matrix
+        Ff : array
+            the reduced rhs vector
+        """
+        free=self.freedofs;fixed=self.fixeddofs
+        if sp.issparse(K):
+            K=sp.csr_matrix(K)
+            Kff=K[free][:,free]
+        else:
+            Kff=K[np.ix_(free,free)]
+        Ff=np.asarray(F,dtype=np.float64)[free]
+        if not homogeneous and fixed.size>0:
+            Ff=Ff-K[free][:,fixed].dot(self.values[fixed])
+        return Kff,Ff
+    def expand(self,uf,homogeneous=False):
+        """
+        build the full solution from the solution of the free dofs
+
+        Parameters
+        ----------
+        uf : array
+            the solution of the reduced system
+        homogeneous : boolean
+            True to put zero on the fixed dofs, otherwise the preset values are used
+        """
+        u=np.zeros(self.nDofs)
+        u[self.freedofs]=uf
+        if not homogeneous:
+            u[self.fixeddofs]=self.values[self.fixeddofs]
+        return u
+    def applysymmetric(self,K,F):
+        """
+        apply the conditions by symmetric lifting without reducing the size: the rows and columns
+        of the fixed dofs are replaced by the identity and Kfc*uc is moved to the rhs
+
+        Returns
+        -------
+        K : sparse matrix or array
+            the modified matrix(a new one)
+        F : array
+            the modified rhs vector(a new one)
+        """
+        uc=np.where(self.fixed,self.values,0.0)
+        F=np.asarray(F,dtype=np.float64)-K.dot(uc)
+        F[self.fixeddofs]=self.values[self.fixeddofs]
+        if sp.issparse(K):
+            D=sp.diags((~self.fixed).astype(np.float64))
+            K=(D@K@D+sp.diags(self.fixed.astype(np.float64))).tocsr()
+        else:
+            K=np.array(K,dtype=np.float64)
+            K[self.fixeddofs,:]=0.0
+            K[:,self.fixeddofs]=0.0
+            K[self.fixeddofs,self.fixeddofs]=1.0
+        return K,F
+    def setsolution(self,u):
+        """
+        put the preset values into the solution vector(in place)
+        """
+        u[self.fixeddofs]=self.values[self.fixeddofs]
+        return u
@@ -0,0 +1,131 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import sys
+from FEToy.fe.assembler import assemblyplan
+from FEToy.fe.geometry import geometrycache
+from FEToy.fe.kernels import bmatrix
+from FEToy.fe import kernels
+
+
+def elasticitymatrix(E,nu,mode='planestress'):
+    """
+    return the 3x3 elasticity matrix D of the voigt notation [sxx,syy,sxy]=D*[exx,eyy,2exy]
+
+    Parameters
+    ----------
+    E : double
+        the youngs modulus
+    nu : double
+        the poisson ratio
+    mode : string
+        'planestress' or 'planestrain'
+    """
+    D=np.zeros((3,3))
+    if mode=='planestress':
+        D[0,0]=E/(1-nu**2)   ;D[0,1]=E*nu/(1-nu**2)
+        D[1,0]=E*nu/(1-nu**2);D[1,1]=E/(1-nu**2)
+        D[2,2]=0.5*E*(1-nu)/(1-nu**2)
+    elif mode=='planestrain':
+        c=E/((1+nu)*(1-2*nu))
+        D[0,0]=c*(1-nu);D[0,1]=c*nu
+        D[1,0]=c*nu    ;D[1,1]=c*(1-nu)
+        D[2,2]=c*0.5*(1-2*nu)
+    else:
+        sys.exit('unsupported mode (%s) for the elasticity matrix, please use planestress or planestrain'%(mode))
+    return D
+
+class linearelasticity:
+    def __init__(self,mesh,shp,gpoints,E=1.0e9,nu=0.3,mode='planestress',geometry=None):
+        """
+        Initialize the vectorized linear elasticity kernel of the 2d mesh, all the element
+        stiffness matrices Ke=int(B^T*D*B) are formed by kernels.elasticitybatch(numpy or numba backend)
+
+        Parameters
+        ----------
+        mesh : mesh2d
+            the mesh class, createmesh() must be called before
+        shp : shape2d
+            the shape function class
+        gpoints : gausspoint2d
+            the gauss points
+        E : double
+            the youngs modulus
+        nu : double
+            the poisson ratio
+        mode : string
+            'planestress' or 'planestrain'
+        geometry : geometrycache
+            the geometry cache of the mesh, a new one is created if it is None
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the elasticity kernel')
+        if not mesh.dim==2:
+            sys.exit('the linear elasticity kernel only works for the 2d mesh')
+        self.mesh=mesh
+        self.setmaterial(E,nu,mode)
+        if geometry is None:
+            geometry=geometrycache(mesh,shp,gpoints)
+        self.geometry=geometry
+        self.plan=None
+    def setmaterial(self,E,nu,mode='planestress'):
+        self.E=E
+        self.nu=nu
+        self.mode=mode
+        self.D=elasticitymatrix(E,nu,mode)
+    def getplan(self):
+        """
+        return the assembly plan with 2 dofs per node, it is created once
+        """
+        if self.plan is None:
+            self.plan=assemblyplan(self.mesh,dofspernode=2)
+        return self.plan
+    def calcstiffness(self,shape_grad,JxW):
+        """
+        calculate the element stiffness matrices of a batch of elements
+
+        Parameters
+        ----------
+        shape_grad : (nElem,nqp,nNodes,2) array
+            the physical shape function gradients
+        JxW : (nElem,nqp) array
+            the jacobian determinate times the gauss point weight
+
+        Returns
+        -------
+        Ke : (nElem,2*nNodes,2*nNodes) array
+        """
+        return kernels.elasticitybatch(shape_grad,JxW,self.D)
+    def elementstiffness(self):
+        """
+        return the element stiffness matrices of all the elements, (nElem,2*nNodes,2*nNodes)
+        """
+        shape_val,shape_grad,JxW=self.geometry.getall()
+        return self.calcstiffness(shape_grad,JxW)
+    def assemble(self,assembler=None):
+        """
+        assemble the global stiffness matrix, the B matrix is built chunk by chunk of the geometry cache
+
+        Parameters
+        ----------
+        assembler : sparseassembler
+            the sparse assembler with dofspernode=2, the matrices are added to it if it is given
+
+        Returns
+        -------
+        K : csr_matrix
+            the global stiffness matrix, ux and uy of node i are the dofs 2*i and 2*i+1
+        """
+        if assembler is not None and not assembler.dofspernode==2:
+            sys.exit('the assembler of the elasticity kernel needs dofspernode=2')
+        plan=self.getplan() if assembler is None else assembler.plan
+        data=np.zeros(plan.nnz) if assembler is None else assembler.data
+        for elements,shape_val,shape_grad,JxW in self.geometry.chunks():
+            plan.assemblematrix(self.calcstiffness(shape_grad,JxW),elements,data)
+        return plan.creatematrix(data)
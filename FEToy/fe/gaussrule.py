@@ -11,6 +11,45 @@ import numpy as np
 import matplotlib.pyplot as plt
 import sys
 
+# the gauss-legendre rules of this process, (dim,ngp)->rule
+gaussrules={}
+
+def gaussrule(dim,ngp):
+    """
+    Get the tensor product gauss-legendre rule on [-1,1]^dim, each rule is generated once
+    and the same read-only array is returned afterwards
+
+    Parameters
+    ----------
+    dim : int
+        the dimension, it could be 1, 2, 3
+    ngp : int
+        the number of gauss points in each direction
+
+    Returns
+    -------
+    rule : (ngp**dim,dim+1) array
+        0->weight, 1->xi, 2->eta, 3->zeta, the last direction runs fastest
+    """
+    key=(dim,ngp)
+    if key not in gaussrules:
+        if ngp<1:
+            sys.exit('the gauss point number must be positive (ngp=%d)'%(ngp))
+        if dim<1 or dim>3:
+            sys.exit('unsupported dimension (dim=%d) for the gauss rule'%(dim))
+        xi,w=np.polynomial.legendre.leggauss(ngp)
+        rule=np.zeros((ngp**dim,dim+1))
+        weight=w
+        for i in range(1,dim):
+            weight=np.outer(weight,w).ravel()
+        rule[:,0]=weight
+        for i in range(dim):
+            # direction i repeats each point ngp**(dim-1-i) times and the whole set ngp**i times
+            rule[:,i+1]=np.tile(np.repeat(xi,ngp**(dim-1-i)),ngp**i)
+        rule.setflags(write=False)
+        gaussrules[key]=rule
+    return gaussrules[key]
+
 class gausspoint1d:
     def __init__(self,ngp=1):
         """
@@ -43,53 +82,7 @@ class gausspoint1d:
         """
         Generate the gauss points 
         """
-        self.gpcoords=np.zeros((self.ngp,2))
-        if self.ngp==1:
-            self.gpcoords[0,0]=2.0
-            self.gpcoords[0,1]=0.0
-        elif self.ngp==2:
-            self.gpcoords[0,0]=1.0
-            self.gpcoords[0,1]=-np.sqrt(1.0/3.0)
-
-            self.gpcoords[1,0]=1.0
-            self.gpcoords[1,1]= np.sqrt(1.0/3.0)
-        elif self.ngp==3:
-            self.gpcoords[0,0]=5.0/9.0
-            self.gpcoords[0,1]=-np.sqrt(3.0/5.0)
-
-            self.gpcoords[1,0]=8.0/9.0
-            self.gpcoords[1,1]= 0.0
-
-            self.gpcoords[2,0]=5.0/9.0
-            self.gpcoords[2,1]= np.sqrt(3.0/5.0)
-        elif self.ngp==4:
-            t=np.sqrt(4.8)
-            w=1.0/3.0/t
-
-            self.gpcoords[0,1]=-np.sqrt((3.0+t)/7.0)
-            self.gpcoords[1,1]=-np.sqrt((3.0-t)/7.0)
-            self.gpcoords[2,1]= np.sqrt((3.0-t)/7.0)
-            self.gpcoords[3,1]= np.sqrt((3.0+t)/7.0)
-
-            self.gpcoords[0,0]=0.5-w
-            self.gpcoords[1,0]=0.5+w
-            self.gpcoords[2,0]=0.5+w
-            self.gpcoords[3,0]=0.5-w
-        elif self.ngp==5:
-            t=np.sqrt(1120.0)
-            self.gpcoords[1-1, 1] = -np.sqrt((70.0 + t) / 126.0)
-            self.gpcoords[2-1, 1] = -np.sqrt((70.0 - t) / 126.0)
-            self.gpcoords[3-1, 1] = 0.0
-            self.gpcoords[4-1, 1] = np.sqrt((70.0 - t) / 126.0)
-            self.gpcoords[5-1, 1] = np.sqrt((70.0 + t) / 126.0)
-     
-            self.gpcoords[1-1, 0] = (21.0 * t + 117.60) / (t * (70.0 + t))
-            self.gpcoords[2-1, 0] = (21.0 * t - 117.60) / (t * (70.0 - t))
-            self.gpcoords[3-1, 0] = 2.0 * (1.0 - self.gpcoords[1-1, 0] -self.gpcoords[2-1, 0])
-            self.gpcoords[4-1, 0] = self.gpcoords[2-1, 0]
-            self.gpcoords[5-1, 0] = self.gpcoords[1-1, 0]
-        else:
-            sys.exit("unsuported gauss point number in 1d case")
+        self.gpcoords=gaussrule(1,self.ngp)
     def update(self):
         """
         Update/re-generate the gauss point number
@@ -145,24 +138,11 @@ class gausspoint2d:
         """
         self.ngp=ngp
         self.ngp2=ngp*ngp
-        if ngp>5:
-            sys.exit("unsupported gauss points number in 2d case!")
     def creategausspoint(self):
         """
         Generate the 2d gauss points
         """
-        if self.ngp>5:
-            sys.exit('can not generate 2d gauss point, unsupported gauss point number (must <=5) !!!')
-        self.gpcoords=np.zeros((self.ngp2,3))
-        gp1d=gausspoint1d(self.ngp)
-        gp1d.creategausspoint()
-        k=0
-        for i in range(self.ngp):
-            for j in range(self.ngp):
-                self.gpcoords[k,0]=gp1d.gpcoords[i,0]*gp1d.gpcoords[j,0]
-                self.gpcoords[k,1]=gp1d.gpcoords[i,1]
-                self.gpcoords[k,2]=gp1d.gpcoords[j,1]
-                k+=1
+        self.gpcoords=gaussrule(2,self.ngp)
     def print(self):
         for i in range(self.ngp2):
             str='%d-th gauss point: xi=%14.5e, eta=%14.5e, weight=%14.5e'%(i+1,self.gpcoords[i,1],self.gpcoords[i,2],self.gpcoords[i,0])
@@ -0,0 +1,119 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import sys
+from FEToy.fe import kernels
+
+
+class geometrycache:
+    def __init__(self,mesh,shp,gpoints,elementconn=None,memorybudget=None):
+        """
+        Initialize the geometry cache, the physical shape function gradients and JxW of all
+        the elements are calculated once and kept for the static mesh. If they do not fit into
+        the memory budget, nothing is stored and they are recalculated chunk by chunk
+
+        Parameters
+        ----------
+        mesh : mesh1d or mesh2d
+            the mesh class, createmesh() must be called before
+        shp : shape1d or shape2d
+            the shape function class
+        gpoints : gausspoint1d or gausspoint2d
+            the gauss points
+        elementconn : array
+            the element connectivity, i.e. mesh.bcconn['top'], the bulk elements are used if it is None
+        memorybudget : int
+            the maximum number of bytes used by the cache, no limit if it is None
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the geometry cache')
+        # the bulk connectivity is read from the mesh at every use, so the chunked path follows renumber()
+        self.bulk=elementconn is None
+        if self.bulk:
+            elementconn=mesh.elementconn
+        self.mesh=mesh
+        self.shp=shp
+        self.gpoints=gpoints
+        self._elementconn=elementconn
+        self.elements=elementconn.shape[0]
+        self.nNodes=elementconn.shape[1]
+        self.nqp=gpoints.gpcoords.shape[0]
+        self.dim=gpoints.gpcoords.shape[1]-1
+        # shape_grad and JxW, the shape function values are a broadcast view of the tabulated ones
+        self.bytesperelement=self.nqp*(self.nNodes*self.dim+1)*8
+        self.memorybudget=memorybudget
+        self.shape_val=None
+        self.shape_grad=None
+        self.JxW=None
+        self.update()
+    @property
+    def elementconn(self):
+        """
+        the element connectivity of the cached elements, mesh.elementconn for the bulk elements
+        """
+        if self.bulk:
+            return self.mesh.elementconn
+        return self._elementconn
+    def update(self):
+        """
+        (re)calculate the cache, i.e. after the mesh coordinates are changed
+        """
+        if self.memorybudget is None or self.elements*self.bytesperelement<=self.memorybudget:
+            self.chunksize=max(self.elements,1)
+            self.cached=True
+            self.shape_val,self.shape_grad,self.JxW=self.calcchunk(0,self.elements)
+        else:
+            self.chunksize=max(int(self.memorybudget//self.bytesperelement),1)
+            self.cached=False
+            self.shape_val=None
+            self.shape_grad=None
+            self.JxW=None
+    def calcchunk(self,start,end):
+        """
+        calculate the shape functions of the elements in [start,end) with the active kernel backend
+        """
+        return kernels.calcbatch(self.mesh.nodecoords,self.elementconn[start:end],self.shp,self.gpoints)
+    def getchunk(self,start,end):
+        """
+        get the shape function values, physical gradients and JxW of the elements in [start,end)
+
+        Returns
+        -------
+        shape_val : (end-start,nqp,nNodes) array
+        shape_grad : (end-start,nqp,nNodes,dim) array
+        JxW : (end-start,nqp) array
+        """
+        if self.cached:
+            return self.shape_val[start:end],self.shape_grad[start:end],self.JxW[start:end]
+        return self.calcchunk(start,end)
+    def chunks(self):
+        """
+        loop over the elements chunk by chunk, one chunk holds all the elements if the cache fits into the memory budget
+
+        Returns
+        -------
+        generator of (elements,shape_val,shape_grad,JxW), elements is the slice of the element ids
+        """
+        for start in range(0,self.elements,self.chunksize):
+            end=min(start+self.chunksize,self.elements)
+            shape_val,shape_grad,JxW=self.getchunk(start,end)
+            yield slice(start,end),shape_val,shape_grad,JxW
+    def getall(self):
+        """
+        get the shape function values, physical gradients and JxW of all the elements
+        """
+        if not self.cached:
+            sys.exit('the geometry cache is beyond the memory budget, please use chunks() instead')
+        return self.shape_val,self.shape_grad,self.JxW
+    def getmemory(self):
+        """
+        return the number of bytes held by the cache
+        """
+        if self.cached:
+            return self.shape_grad.nbytes+self.JxW.nbytes
+        return 0
@@ -0,0 +1,302 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import sys
+try:
+    from numba import njit,prange
+except ImportError:
+    njit=None
+    prange=range
+
+
+# the active backend, 'numba' if numba is installed, otherwise 'numpy'
+backend='numba' if njit is not None else 'numpy'
+
+def setbackend(name='auto'):
+    """
+    select the backend of the element kernels
+
+    Parameters
+    ----------
+    name : string
+        'numba'(compiled, parallel over the elements), 'numpy'(batched einsum), 'auto' for numba if it is installed
+    """
+    global backend
+    if name=='auto':
+        name='numba' if njit is not None else 'numpy'
+    if name not in ['numba','numpy']:
+        sys.exit('unsupported kernel backend (%s), please use numba, numpy or auto'%(name))
+    if name=='numba' and njit is None:
+        sys.exit('numba is not installed, please use the numpy backend')
+    backend=name
+
+def getbackend():
+    return backend
+
+###########################################################################
+### the compiled kernels, one element per iteration of the parallel loop
+###########################################################################
+def jacobianloop(coords,dval,w,grad,JxW):
+    """
+    map the reference gradients of all the elements on all the gauss points, grad and JxW are filled in place
+    """
+    nElem=coords.shape[0];nNodes=coords.shape[1];dim=coords.shape[2];nqp=dval.shape[0]
+    for e in prange(nElem):
+        for q in range(nqp):
+            if dim==1:
+                dxdxi=0.0
+                for i in range(nNodes):
+                    dxdxi+=dval[q,i,0]*coords[e,i,0]
+                JxW[e,q]=abs(dxdxi)*w[q]
+                for i in range(nNodes):
+                    grad[e,q,i,0]=dval[q,i,0]/dxdxi
+            else:
+                dxdxi=0.0;dxdeta=0.0;dydxi=0.0;dydeta=0.0
+                for i in range(nNodes):
+                    dxdxi +=dval[q,i,0]*coords[e,i,0]
+                    dxdeta+=dval[q,i,1]*coords[e,i,0]
+                    dydxi +=dval[q,i,0]*coords[e,i,1]
+                    dydeta+=dval[q,i,1]*coords[e,i,1]
+                jacdet=dxdxi*dydeta-dydxi*dxdeta
+                JxW[e,q]=jacdet*w[q]
+                for i in range(nNodes):
+                    grad[e,q,i,0]=( dydeta*dval[q,i,0]-dydxi *dval[q,i,1])/jacdet
+                    grad[e,q,i,1]=(-dxdeta*dval[q,i,0]+dxdxi*dval[q,i,1])/jacdet
+
+def scalarloop(grad,JxW,val,a,b,Ke):
+    """
+    Ke=int(a*N_i*N_j+b*gradN_i.gradN_j) of all the elements, filled in place
+    """
+    nElem=grad.shape[0];nqp=grad.shape[1];nNodes=grad.shape[2];dim=grad.shape[3]
+    for e in prange(nElem):
+        for q in range(nqp):
+            for i in range(nNodes):
+                for j in range(nNodes):
+                    gg=0.0
+                    for d in range(dim):
+                        gg+=grad[e,q,i,d]*grad[e,q,j,d]
+                    Ke[e,i,j]+=(a*val[q,i]*val[q,j]+b*gg)*JxW[e,q]
+
+def elasticityloop(grad,JxW,D,Ke):
+    """
+    Ke=int(B^T*D*B) of all the elements, the dofs are ordered as ux1,uy1,ux2,uy2..., filled in place
+    """
+    nElem=grad.shape[0];nqp=grad.shape[1];nNodes=grad.shape[2]
+    for e in prange(nElem):
+        for q in range(nqp):
+            for i in range(nNodes):
+                # B_i=[[dNi/dx,0],[0,dNi/dy],[dNi/dy,dNi/dx]], DB=D*B_j
+                gxi=grad[e,q,i,0];gyi=grad[e,q,i,1]
+                for j in range(nNodes):
+                    gxj=grad[e,q,j,0];gyj=grad[e,q,j,1]
+                    for b in range(2):
+                        if b==0:
+                            c0=gxj;c1=0.0;c2=gyj
+                        else:
+                            c0=0.0;c1=gyj;c2=gxj
+                        db0=D[0,0]*c0+D[0,1]*c1+D[0,2]*c2
+                        db1=D[1,0]*c0+D[1,1]*c1+D[1,2]*c2
+                        db2=D[2,0]*c0+D[2,1]*c1+D[2,2]*c2
+                        Ke[e,2*i  ,2*j+b]+=(gxi*db0+gyi*db2)*JxW[e,q]
+                        Ke[e,2*i+1,2*j+b]+=(gyi*db1+gxi*db2)*JxW[e,q]
+
+if njit is not None:
+    jacobianloop=njit(parallel=True,cache=True)(jacobianloop)
+    scalarloop=njit(parallel=True,cache=True)(scalarloop)
+    elasticityloop=njit(parallel=True,cache=True)(elasticityloop)
+
+###########################################################################
+### the uniform interface, the callers do not depend on the backend
+###########################################################################
+def bmatrix(shape_grad):
+    """
+    build the strain-displacement matrix B of all the elements on all the gauss points,
+    the columns follow the dof order of the assembler, i.e. ux1,uy1,ux2,uy2...
+
+    Parameters
+    ----------
+    shape_grad : (nElem,nqp,nNodes,2) array
+        the physical shape function gradients
+
+    Returns
+    -------
+    B : (nElem,nqp,3,2*nNodes) array
+    """
+    nElem,nqp,nNodes,dim=shape_grad.shape
+    if not dim==2:
+        sys.exit('the B matrix is only supported for 2d elements')
+    B=np.zeros((nElem,nqp,3,nNodes,2))
+    B[:,:,0,:,0]=shape_grad[:,:,:,0] # exx=dux/dx
+    B[:,:,1,:,1]=shape_grad[:,:,:,1] # eyy=duy/dy
+    B[:,:,2,:,0]=shape_grad[:,:,:,1] # 2exy=dux/dy+duy/dx
+    B[:,:,2,:,1]=shape_grad[:,:,:,0]
+    return B.reshape((nElem,nqp,3,2*nNodes))
+
+def elementcoords(nodecoords,elementconn,shp):
+    """
+    gather the node coordinates of the elements, (nElem,nNodes,dim)
+    """
+    conn=np.asarray(elementconn)
+    if conn.ndim==1:
+        conn=conn.reshape((1,-1))
+    if not conn.shape[1]==shp.nNodes:
+        sys.exit('the element connectivity does not match with the mesh type in kernels')
+    coords=np.asarray(nodecoords,dtype=np.float64)
+    if coords.ndim==1:
+        coords=coords[:,None]
+    dim=1 if 'edge' in shp.meshtype else 2
+    if not coords.shape[1]==dim:
+        sys.exit('the kernels only support the bulk elements, the dimension of the coordinates does not match')
+    return coords[conn]
+
+def isbulk(nodecoords,shp):
+    """
+    return True if the elements of shp have the dimension of the mesh, False for the line elements of a 2d mesh
+    """
+    coords=np.asarray(nodecoords)
+    dim=1 if 'edge' in shp.meshtype else 2
+    if coords.ndim==1:
+        return dim==1
+    return coords.shape[1]==dim
+
+def calcbatch(nodecoords,elementconn,shp,gpoints):
+    """
+    calculate the shape function values, the physical gradients and JxW of all the elements with the
+    active backend, the line elements of a 2d mesh(bcconn) always use shp.calcbatch
+
+    Parameters
+    ----------
+    nodecoords : array
+        the node coordinates of the mesh
+    elementconn : array
+        the element connectivity, (nElem,nNodes)
+    shp : shape1d or shape2d
+        the shape function class
+    gpoints : gausspoint1d or gausspoint2d
+        the gauss points
+
+    Returns
+    -------
+    shape_val : (nElem,nqp,nNodes) array, a read-only view of the tabulated values
+    shape_grad : (nElem,nqp,nNodes,dim) array
+    JxW : (nElem,nqp) array
+    """
+    if backend=='numpy' or not isbulk(nodecoords,shp):
+        return shp.calcbatch(nodecoords,elementconn,gpoints)
+    coords=elementcoords(nodecoords,elementconn,shp)
+    shp_val,shp_grad=shp.tabulate(gpoints)
+    dval=np.ascontiguousarray(shp_grad.reshape(shp_grad.shape[:2]+(-1,)))
+    w=np.ascontiguousarray(gpoints.gpcoords[:,0])
+    grad=np.empty((coords.shape[0],)+dval.shape)
+    JxW=np.empty((coords.shape[0],dval.shape[0]))
+    jacobianloop(coords,dval,w,grad,JxW)
+    if coords.shape[2]==1:
+        if np.any(np.abs(JxW)<1.0e-16*np.abs(w)):
+            sys.exit('error: you have one singular 1d mesh !!!')
+    elif np.any(JxW<1.0e-16*w):
+        sys.exit('error: you have one singular 2d mesh !!!')
+    shape_val=np.broadcast_to(shp_val,(coords.shape[0],)+shp_val.shape)
+    return shape_val,grad,JxW
+
+def mapgradients(nodecoords,elementconn,shp,gpoints):
+    """
+    calculate the physical shape function gradients and JxW of all the elements
+
+    Returns
+    -------
+    shape_grad : (nElem,nqp,nNodes,dim) array
+    JxW : (nElem,nqp) array
+    """
+    shape_val,shape_grad,JxW=calcbatch(nodecoords,elementconn,shp,gpoints)
+    return shape_grad,JxW
+
+def scalarbatch(shape_val,shape_grad,JxW,a=0.0,b=1.0):
+    """
+    calculate the element matrices Ke=int(a*N_i*N_j+b*gradN_i.gradN_j) of a batch of elements from their
+    geometry(calcbatch or geometrycache)
+
+    Returns
+    -------
+    Ke : (nElem,nNodes,nNodes) array
+    """
+    nElem=JxW.shape[0];nNodes=shape_val.shape[2]
+    Ke=np.zeros((nElem,nNodes,nNodes))
+    if backend=='numpy' or nElem==0:
+        if not a==0.0:
+            Ke+=a*np.einsum('eqi,eqj,eq->eij',shape_val,shape_val,JxW,optimize=True)
+        if not b==0.0:
+            Ke+=b*np.einsum('eqid,eqjd,eq->eij',shape_grad,shape_grad,JxW,optimize=True)
+        return Ke
+    # the shape function values are the same for all the elements
+    scalarloop(np.ascontiguousarray(shape_grad),np.ascontiguousarray(JxW),np.ascontiguousarray(shape_val[0]),
+               float(a),float(b),Ke)
+    return Ke
+
+def scalarmatrices(nodecoords,elementconn,shp,gpoints,a=0.0,b=1.0):
+    """
+    calculate the element matrices Ke=int(a*N_i*N_j+b*gradN_i.gradN_j) of all the elements
+
+    Returns
+    -------
+    Ke : (nElem,nNodes,nNodes) array
+    """
+    shape_val,shape_grad,JxW=calcbatch(nodecoords,elementconn,shp,gpoints)
+    return scalarbatch(shape_val,shape_grad,JxW,a,b)
+
+def stiffnessmatrices(nodecoords,elementconn,shp,gpoints,coeff=1.0):
+    """
+    the element matrices of the poisson equation, Ke=int(coeff*gradN_i.gradN_j)
+    """
+    return scalarmatrices(nodecoords,elementconn,shp,gpoints,a=0.0,b=coeff)
+
+def massmatrices(nodecoords,elementconn,shp,gpoints,coeff=1.0):
+    """
+    the element mass matrices, Me=int(coeff*N_i*N_j)
+    """
+    return scalarmatrices(nodecoords,elementconn,shp,gpoints,a=coeff,b=0.0)
+
+def diffusionmatrices(nodecoords,elementconn,shp,gpoints,D=1.0,dt=1.0):
+    """
+    the element matrices of the backward euler diffusion equation, Ke=Me/dt+D*Ke
+    """
+    return scalarmatrices(nodecoords,elementconn,shp,gpoints,a=1.0/dt,b=D)
+
+def elasticitybatch(shape_grad,JxW,D):
+    """
+    calculate the element stiffness matrices Ke=int(B^T*D*B) of a batch of 2d elements from their geometry
+
+    Parameters
+    ----------
+    shape_grad : (nElem,nqp,nNodes,2) array
+        the physical shape function gradients
+    JxW : (nElem,nqp) array
+        the jacobian determinate times the gauss point weight
+    D : (3,3) array
+        the elasticity matrix, see elasticity.elasticitymatrix
+
+    Returns
+    -------
+    Ke : (nElem,2*nNodes,2*nNodes) array, the dofs are ordered as ux1,uy1,ux2,uy2...
+    """
+    if not shape_grad.shape[3]==2:
+        sys.exit('the elasticity kernel only works for the 2d elements')
+    D=np.ascontiguousarray(D,dtype=np.float64)
+    if backend=='numpy':
+        B=bmatrix(shape_grad)
+        return np.einsum('eqai,ab,eqbj,eq->eij',B,D,B,JxW,optimize=True)
+    Ke=np.zeros((JxW.shape[0],2*shape_grad.shape[2],2*shape_grad.shape[2]))
+    elasticityloop(np.ascontiguousarray(shape_grad),np.ascontiguousarray(JxW),D,Ke)
+    return Ke
+
+def elasticitymatrices(nodecoords,elementconn,shp,gpoints,D):
+    """
+    the element stiffness matrices of the 2d linear elasticity of all the elements, Ke=int(B^T*D*B)
+    """
+    shape_val,shape_grad,JxW=calcbatch(nodecoords,elementconn,shp,gpoints)
+    return elasticitybatch(shape_grad,JxW,D)
@@ -0,0 +1,253 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import scipy
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+import time
+import sys
+try:
+    import scikits.umfpack as umfpack
+except ImportError:
+    umfpack=None
+try:
+    from sksparse import cholmod
+except ImportError:
+    cholmod=None
+try:
+    import pyamg
+except ImportError:
+    pyamg=None
+
+# scipy>=1.12 names the relative tolerance of the krylov solvers rtol, the older versions tol
+tolkey='rtol' if tuple(int(v) for v in scipy.__version__.split('.')[:2])>=(1,12) else 'tol'
+
+class solverconfig:
+    def __init__(self,solver='superlu',preconditioner='none',tolerance=1.0e-10,maxiters=1000,restart=50,
+                 droptol=1.0e-4,fillfactor=10.0,history=False):
+        """
+        Initialize the configuration of the linear solver
+
+        Parameters
+        ----------
+        solver : string
+            the direct solvers: 'superlu', 'umfpack'(scikits.umfpack), 'cholmod'(scikit-sparse, SPD only),
+            the krylov solvers: 'cg'(SPD only), 'gmres', 'bicgstab'
+        preconditioner : string
+            the preconditioner of the krylov solvers: 'none', 'jacobi', 'ilu', 'amg'(pyamg),
+            'multigrid'(the geometric multigrid of the stenciloperator)
+        tolerance : double
+            the relative residual tolerance of the krylov solvers
+        maxiters : int
+            the maximum iterations of the krylov solvers
+        restart : int
+            the restart of gmres
+        droptol : double
+            the drop tolerance of the incomplete LU
+        fillfactor : double
+            the fill factor of the incomplete LU
+        history : boolean
+            True to record the relative residual |F-K*x|/|F| of each krylov iteration(of each restart
+            cycle for gmres), it costs one extra matrix-vector product per record
+        """
+        self.solver=solver
+        self.preconditioner=preconditioner
+        self.tolerance=tolerance
+        self.maxiters=maxiters
+        self.restart=restart
+        self.droptol=droptol
+        self.fillfactor=fillfactor
+        self.history=history
+        self.check()
+    def check(self):
+        if self.solver not in ['superlu','umfpack','cholmod','cg','gmres','bicgstab']:
+            sys.exit('unsupported linear solver (%s) in solverconfig'%(self.solver))
+        if self.preconditioner not in ['none','jacobi','ilu','amg','multigrid']:
+            sys.exit('unsupported preconditioner (%s) in solverconfig'%(self.preconditioner))
+    def isdirect(self):
+        return self.solver in ['superlu','umfpack','cholmod']
+###########################################################################
+class solverinfo:
+    def __init__(self,method=''):
+        """
+        the information of one linear solve
+        """
+        self.method=method
+        self.iterations=0
+        self.residuals=[]
+        self.setuptime=0.0
+        self.solvetime=0.0
+        self.converged=True
+    def print(self):
+        str='%s: iters=%d, setup time=%12.4e s, solve time=%12.4e s'%(self.method,self.iterations,self.setuptime,self.solvetime)
+        if len(self.residuals)>0:
+            str+=', |R|=%14.5e'%(self.residuals[-1])
+        if not self.converged:
+            str+=' (not converged!)'
+        print(str)
+###########################################################################
+class linearsolver:
+    def __init__(self,config=None):
+        """
+        Initialize the linear solver, the factorization or the preconditioner is built in setup()
+        and reused by solve() until setup() is called again
+
+        Parameters
+        ----------
+        config : solverconfig
+            the solver configuration, superlu is used if it is None
+        """
+        if config is None:
+            config=solverconfig()
+        self.config=config
+        self.K=None
+        self.factor=None
+        self.M=None
+        self.setuptime=0.0
+    def setup(self,K):
+        """
+        factorize K(direct solvers) or build the preconditioner(krylov solvers)
+
+        Parameters
+        ----------
+        K : sparse matrix, array, LinearOperator or stenciloperator
+            the system matrix, the matrix-free operators only work with the krylov solvers
+        """
+        start=time.perf_counter()
+        config=self.config
+        operator=K
+        if hasattr(K,'aslinearoperator'):
+            diagonal=K.diagonal()
+            K=K.aslinearoperator()
+        elif isinstance(K,spla.LinearOperator):
+            diagonal=None
+        else:
+            if not sp.issparse(K):
+                K=sp.csr_matrix(K)
+            diagonal=K.diagonal()
+        self.K=K
+        self.factor=None
+        self.M=None
+        if config.isdirect():
+            if isinstance(K,spla.LinearOperator):
+                sys.exit('the direct solver needs the assembled matrix, please use the krylov solvers')
+            if config.solver=='cholmod' and cholmod is not None:
+                factor=cholmod.cholesky(K.tocsc())
+                self.factor=factor
+            elif config.solver=='umfpack' and umfpack is not None:
+                factor=umfpack.splu(K.tocsc())
+                self.factor=factor.solve
+            else:
+                if not config.solver=='superlu':
+                    print('%s is not installed, use superlu instead'%(config.solver))
+                factor=spla.splu(K.tocsc())
+                self.factor=factor.solve
+        elif config.preconditioner=='jacobi':
+            if diagonal is None:
+                sys.exit('the jacobi preconditioner needs the diagonal of the matrix')
+            invdiag=1.0/diagonal
+            self.M=spla.LinearOperator(K.shape,matvec=lambda x:invdiag*x,dtype=np.float64)
+        elif config.preconditioner=='ilu':
+            if isinstance(K,spla.LinearOperator):
+                sys.exit('the ilu preconditioner needs the assembled matrix')
+            ilu=spla.spilu(K.tocsc(),drop_tol=config.droptol,fill_factor=config.fillfactor)
+            self.M=spla.LinearOperator(K.shape,matvec=ilu.solve,dtype=np.float64)
+        elif config.preconditioner=='amg':
+            if pyamg is None:
+                sys.exit('pyamg is not installed, the amg preconditioner is not available')
+            if isinstance(K,spla.LinearOperator):
+                sys.exit('the amg preconditioner needs the assembled matrix')
+            self.M=pyamg.smoothed_aggregation_solver(K.tocsr()).aspreconditioner()
+        elif config.preconditioner=='multigrid':
+            if not hasattr(operator,'multigrid'):
+                sys.exit('the multigrid preconditioner needs the stencil operator of the structured mesh')
+            self.M=operator.multigrid().aslinearoperator()
+        self.setuptime=time.perf_counter()-start
+    def solve(self,K,F,x0=None):
+        """
+        solve K*x=F
+
+        Parameters
+        ----------
+        K : sparse matrix, array, LinearOperator or stenciloperator
+            the system matrix, None to reuse the one of the last setup()
+        F : array
+            the rhs vector
+        x0 : array
+            the initial guess of the krylov solvers
+
+        Returns
+        -------
+        x : array
+            the solution
+        info : solverinfo
+            the iterations, residual history and timings
+        """
+        config=self.config
+        info=solverinfo(config.solver)
+        if K is not None:
+            self.setup(K)
+            info.setuptime=self.setuptime
+        elif self.K is None:
+            sys.exit('please call setup() or give the matrix before you solve the system')
+        if not config.isdirect():
+            info.method=config.solver+'+'+config.preconditioner
+        F=np.asarray(F,dtype=np.float64)
+        start=time.perf_counter()
+        if config.isdirect():
+            x=self.factor(F)
+            info.iterations=1
+        else:
+            x,info=self.krylov(F,x0,info)
+        info.solvetime=time.perf_counter()-start
+        return x,info
+    def krylov(self,F,x0,info):
+        """
+        run the krylov solver
+        """
+        config=self.config
+        K=self.K
+        normF=np.linalg.norm(F)
+        if normF==0.0:
+            return np.zeros_like(F),info
+        def relresidual(xk):
+            return np.linalg.norm(F-K.dot(xk))/normF
+        def callback(xk):
+            info.iterations+=1
+            if config.history:
+                info.residuals.append(relresidual(xk))
+        def gmrescallback(rk):
+            info.iterations+=1
+        def cyclecallback(xk):
+            info.residuals.append(relresidual(xk))
+        kwargs={'x0':x0,'maxiter':config.maxiters,'M':self.M,'atol':0.0,tolkey:config.tolerance}
+        if config.solver=='cg':
+            method=spla.cg;kwargs['callback']=callback
+        elif config.solver=='bicgstab':
+            method=spla.bicgstab;kwargs['callback']=callback
+        else:
+            method=spla.gmres;kwargs['restart']=config.restart
+            if config.history:
+                # the solution is only available at the end of each restart cycle, the inner iterations
+                # are counted by the products with K, one of each cycle is the restart residual
+                matvecs=[0]
+                def matvec(v):
+                    matvecs[0]+=1
+                    return K.dot(v)
+                kwargs['callback']=cyclecallback;kwargs['callback_type']='x'
+                x,flag=method(spla.LinearOperator(K.shape,matvec=matvec,dtype=np.float64),F,**kwargs)
+                info.iterations=matvecs[0]-len(info.residuals)
+            else:
+                kwargs['callback']=gmrescallback;kwargs['callback_type']='pr_norm'
+        if not (config.solver=='gmres' and config.history):
+            x,flag=method(K,F,**kwargs)
+        info.converged=(flag==0)
+        if not info.converged:
+            print('warning: %s does not converge in %d iterations'%(info.method,config.maxiters))
+        return x,info
@@ -0,0 +1,302 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator
+import sys
+from FEToy.mesh.meshutils import validcoloring
+from FEToy.fe.shapefun import shape1d
+from FEToy.fe.gaussrule import gausspoint1d
+from FEToy.fe import kernels
+from FEToy.fe.kernels import prange
+
+
+def makesumfactloop(n,nq,V,uniform):
+    """
+    build the compiled sum factorization loop y+=K_e*u_e, the sizes n=p+1, nq and V are closure constants
+    so the small loops are unrolled, and V elements are handled together in the innermost loops so the
+    arithmetic is vectorized over the elements. The slots [start,end) of conn must not share a node(one
+    color) and start must be a multiple of V, G is the blocked metric (nblocks,nq,nq,4,V) or (1,nq,nq,4,1)
+    """
+    def sumfactloop(u,conn,start,end,B,D,G,coeff,mass,y):
+        nblocks=(end-start+V-1)//V
+        for ib in prange(nblocks):
+            # the work arrays are allocated once per block
+            X=np.zeros((n,n,V));Xb=np.empty((n,nq,V));Xd=np.empty((n,nq,V));P=np.empty((nq,n,V));Q=np.empty((nq,n,V))
+            e0=start+ib*V;m=min(V,end-e0);g=0 if uniform else e0//V
+            for j in range(m):
+                for b in range(n):
+                    for a in range(n):
+                        X[b,a,j]=u[conn[e0+j,b,a]]
+            for b in range(n):
+                for qx in range(nq):
+                    for j in range(V):
+                        sb=0.0;sd=0.0
+                        for a in range(n):
+                            sb+=X[b,a,j]*B[qx,a]
+                            sd+=X[b,a,j]*D[qx,a]
+                        Xb[b,qx,j]=sb;Xd[b,qx,j]=sd
+            for qx in range(nq):
+                for b in range(n):
+                    for j in range(V):
+                        P[qx,b,j]=0.0;Q[qx,b,j]=0.0
+                for qe in range(nq):
+                    for j in range(V):
+                        val=0.0;dxi=0.0;deta=0.0
+                        for b in range(n):
+                            val +=Xb[b,qx,j]*B[qe,b]
+                            deta+=Xb[b,qx,j]*D[qe,b]
+                            dxi +=Xd[b,qx,j]*B[qe,b]
+                        k=0 if uniform else j
+                        fxi =coeff*(G[g,qx,qe,0,k]*dxi+G[g,qx,qe,1,k]*deta)
+                        feta=coeff*(G[g,qx,qe,1,k]*dxi+G[g,qx,qe,2,k]*deta)
+                        fval=mass*G[g,qx,qe,3,k]*val
+                        for b in range(n):
+                            P[qx,b,j]+=fxi*B[qe,b]
+                            Q[qx,b,j]+=feta*D[qe,b]+fval*B[qe,b]
+            for j in range(m):
+                for b in range(n):
+                    for a in range(n):
+                        s=0.0
+                        for qx in range(nq):
+                            s+=P[qx,b,j]*D[qx,a]+Q[qx,b,j]*B[qx,a]
+                        y[conn[e0+j,b,a]]+=s
+    # fastmath lets llvm contract and reorder the unrolled sums, which is needed for the vectorization
+    return kernels.njit(parallel=True,fastmath=True,cache=True)(sumfactloop)
+
+# the compiled loops of each (n,nq,V,uniform)
+sumfactloops={}
+
+def getsumfactloop(n,nq,V,uniform):
+    """
+    return the compiled sum factorization loop, it is built at the first use
+    """
+    key=(n,nq,V,uniform)
+    if key not in sumfactloops:
+        sumfactloops[key]=makesumfactloop(n,nq,V,uniform)
+    return sumfactloops[key]
+
+
+class sumfactoperator:
+    def __init__(self,mesh,coeff=1.0,mass=0.0,ngp=None,fixednodes=None):
+        """
+        Initialize the matrix-free operator y=K*u of the quad4/quad9 mesh(one dof per node), with
+        K=int(coeff*gradN_i.gradN_j+mass*N_i*N_j), i.e. mass=1/dt, coeff=D for the diffusion equation.
+        The element values are handled as (p+1)x(p+1) tensors and the 1d basis of shape1d(edge2/edge3)
+        is applied along xi and eta one after another(sum factorization), so only the nodal vectors
+        and the gauss point geometry are stored, the global matrix is never assembled
+
+        Parameters
+        ----------
+        mesh : mesh2d
+            the quad4 or quad9 mesh, createmesh() must be called before
+        coeff : double
+            the coefficient of the stiffness term
+        mass : double
+            the coefficient of the mass term
+        ngp : int
+            the number of 1d gauss points, order+1 if it is None
+        fixednodes : array
+            the dirichlet nodes, their rows and columns are replaced by the identity
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the matrix-free operator')
+        if not (mesh.dim==2 and hasattr(mesh,'localnodes')):
+            sys.exit('the sum factorization only works for the quad4/quad9 mesh')
+        p=mesh.order
+        if ngp is None:
+            ngp=p+1
+        self.mesh=mesh
+        self.coeff=coeff
+        self.mass=mass
+        self.order=p
+        self.shape=(mesh.nodes,mesh.nodes)
+
+        # the 1d basis on the 1d gauss points, the node order of edge2/edge3 is the grid order 0..p
+        shp=shape1d(meshtype='edge%d'%(p+1))
+        shp.update()
+        gpoints=gausspoint1d(ngp=ngp)
+        gpoints.creategausspoint()
+        shp_val,shp_grad=shp.tabulate(gpoints)
+        self.B=np.ascontiguousarray(shp_val)  # (nq,p+1)
+        self.D=np.ascontiguousarray(shp_grad) # (nq,p+1)
+        self.w=gpoints.gpcoords[:,0]
+
+        # the elements are sorted by color and each color is padded to a multiple of batch, the slot k holds
+        # the element slots[k](-1 for the padding), so the elements of one block share the color and the
+        # blocked geometry of the compiled loop is read contiguously
+        if not validcoloring(mesh):
+            mesh.colorelements()
+        self.batch=16
+        slots=[];self.colorranges=[];start=0
+        for group in mesh.colorgroups:
+            padding=(-len(group))%self.batch
+            slots+=[np.asarray(group,dtype=np.int64),np.full(padding,-1,dtype=np.int64)]
+            self.colorranges.append((start,start+len(group)))
+            start+=len(group)+padding
+        slots=np.concatenate(slots)
+        self.padding=np.flatnonzero(slots<0)
+        # tensorconn[k,b,a] is the node at the grid offset (a,b) of the element in slot k, node 0 for the padding
+        elementconn=mesh.elementconn[np.maximum(slots,0)]
+        self.tensorconn=np.zeros((slots.shape[0],p+1,p+1),dtype=mesh.elementconn.dtype)
+        for k,(a,b) in enumerate(mesh.localnodes):
+            self.tensorconn[:,b,a]=elementconn[:,k]
+        self.scatter=self.tensorconn.reshape(-1)
+        self.updategeometry()
+        self.setfixednodes(fixednodes)
+    def interpolate(self,X):
+        """
+        the values and the reference gradients on the gauss points of the element tensors X
+
+        Parameters
+        ----------
+        X : (nElem,p+1,p+1) array
+            X[e,b,a] is the value of the node (a,b) of element e
+
+        Returns
+        -------
+        val, dxi, deta : (nElem,nq,nq) arrays, the gauss point (qx,qe) is stored as [e,qx,qe]
+        """
+        nE=X.shape[0];n=self.order+1;nq=self.B.shape[0]
+        # contract a: (nElem,b,qx)
+        Xb=(X.reshape((-1,n))@self.B.T).reshape((nE,n,nq))
+        Xd=(X.reshape((-1,n))@self.D.T).reshape((nE,n,nq))
+        # contract b: (nElem,qx,qe)
+        val =np.matmul(Xb.transpose(0,2,1),self.B.T)
+        deta=np.matmul(Xb.transpose(0,2,1),self.D.T)
+        dxi =np.matmul(Xd.transpose(0,2,1),self.B.T)
+        return val,dxi,deta
+    def project(self,fval,fxi,feta):
+        """
+        the transpose of interpolate: y[e,b,a]=sum_q(fval*N_a*N_b+fxi*dN_a*N_b+feta*N_a*dN_b)
+        """
+        # contract qe: (nElem,qx,b)
+        P=np.matmul(fxi,self.B)
+        Q=np.matmul(feta,self.D)
+        if fval is not None:
+            Q+=np.matmul(fval,self.B)
+        # contract qx: (nElem,b,a)
+        return np.matmul(P.transpose(0,2,1),self.D)+np.matmul(Q.transpose(0,2,1),self.B)
+    def updategeometry(self):
+        """
+        calculate the gauss point metric of the elements, G=w*det(J)*J^{-1}*J^{-T} and w*det(J), i.e. after
+        the mesh coordinates are changed. The metric is stored in blocks of batch slots, G[block,qx,qe,k,j]
+        with k=G00,G01,G11,W, the padding slots are zero. For the uniform mesh only the first element is stored
+        """
+        mesh=self.mesh
+        uniform=getattr(mesh,'uniform',False)
+        conn=self.tensorconn[:1] if uniform else self.tensorconn
+        x=mesh.nodecoords[conn,0];y=mesh.nodecoords[conn,1]
+        xval,xxi,xeta=self.interpolate(x)
+        yval,yxi,yeta=self.interpolate(y)
+        jacdet=xxi*yeta-xeta*yxi
+        if not uniform:
+            jacdet[self.padding]=1.0
+        if np.any(jacdet<1.0e-16):
+            sys.exit('error: you have one singular 2d mesh !!!')
+        W=jacdet*np.outer(self.w,self.w)[None,:,:] # (nSlots,qx,qe)
+        if not uniform:
+            W[self.padding]=0.0
+        G=np.stack([W*(xeta*xeta+yeta*yeta)/(jacdet*jacdet),
+                    -W*(xxi*xeta+yxi*yeta)/(jacdet*jacdet),
+                    W*(xxi*xxi+yxi*yxi)/(jacdet*jacdet),W],axis=-1)
+        V=1 if uniform else self.batch
+        nq=self.B.shape[0]
+        self.G=np.ascontiguousarray(G.reshape((-1,V,nq,nq,4)).transpose(0,2,3,4,1))
+    def metric(self):
+        """
+        return the views G00,G01,G11,W of the blocked metric, (nSlots/batch,batch,nq,nq) or (1,1,nq,nq) for the uniform mesh
+        """
+        G=self.G.transpose(0,4,1,2,3)
+        return G[...,0],G[...,1],G[...,2],G[...,3]
+    def setfixednodes(self,fixednodes):
+        """
+        set up the dirichlet nodes, None to remove them
+        """
+        self.fixed=None
+        if fixednodes is not None:
+            self.fixed=np.zeros(self.mesh.nodes,dtype=bool)
+            self.fixed[np.asarray(fixednodes)]=True
+    def apply(self,u):
+        """
+        calculate y=K*u without the dirichlet nodes, the compiled loop is used if the kernel backend is numba
+        """
+        u=np.asarray(u,dtype=np.float64)
+        uniform=(self.G.shape[0]==1)
+        if kernels.getbackend()=='numba':
+            loop=getsumfactloop(self.order+1,self.B.shape[0],self.batch,uniform)
+            y=np.zeros(self.mesh.nodes)
+            for start,end in self.colorranges:
+                loop(u,self.tensorconn,start,end,self.B,self.D,self.G,float(self.coeff),float(self.mass),y)
+            return y
+        nq=self.B.shape[0]
+        X=u[self.tensorconn]
+        val,dxi,deta=[Z.reshape((-1,self.batch,nq,nq)) for Z in self.interpolate(X)]
+        G00,G01,G11,W=self.metric()
+        fxi =self.coeff*(G00*dxi+G01*deta)
+        feta=self.coeff*(G01*dxi+G11*deta)
+        fval=None
+        if not self.mass==0.0:
+            fval=(self.mass*W*val).reshape((-1,nq,nq))
+        Y=self.project(fval,fxi.reshape((-1,nq,nq)),feta.reshape((-1,nq,nq)))
+        Y[self.padding]=0.0
+        return np.bincount(self.scatter,weights=Y.reshape(-1),minlength=self.mesh.nodes)
+    def matvec(self,u):
+        """
+        calculate y=K*u, the rows and columns of the dirichlet nodes are the identity
+        """
+        if self.fixed is None:
+            return self.apply(u)
+        u=np.asarray(u,dtype=np.float64)
+        y=self.apply(np.where(self.fixed,0.0,u))
+        y[self.fixed]=u[self.fixed]
+        return y
+    def diagonal(self):
+        """
+        return the diagonal of K, i.e. for the jacobi preconditioner
+        """
+        nq=self.B.shape[0];shape=(self.tensorconn.shape[0],nq,nq)
+        G00,G01,G11,W=[np.broadcast_to(Z,(self.tensorconn.shape[0]//self.batch,self.batch,nq,nq)).reshape(shape) for Z in self.metric()]
+        B2=self.B*self.B;D2=self.D*self.D;BD=self.B*self.D
+        # K[(a,b),(a,b)]=sum_q(G00*(dN_a*N_b)^2+2*G01*(dN_a*N_b)*(N_a*dN_b)+G11*(N_a*dN_b)^2)
+        Y=self.coeff*(np.einsum('exy,xa,yb->eba',G00,D2,B2,optimize=True)
+                     +2.0*np.einsum('exy,xa,yb->eba',G01,BD,BD,optimize=True)
+                     +np.einsum('exy,xa,yb->eba',G11,B2,D2,optimize=True))
+        if not self.mass==0.0:
+            Y+=self.mass*np.einsum('exy,xa,yb->eba',W,B2,B2,optimize=True)
+        Y[self.padding]=0.0
+        diag=np.bincount(self.scatter,weights=Y.reshape(-1),minlength=self.mesh.nodes)
+        if self.fixed is not None:
+            diag[self.fixed]=1.0
+        return diag
+    def liftrhs(self,F,ubc):
+        """
+        move the dirichlet values to the rhs, the system matvec(u)=rhs then gives u=ubc on the dirichlet nodes
+
+        Parameters
+        ----------
+        F : array
+            the rhs vector
+        ubc : array
+            the vector holding the dirichlet values on the dirichlet nodes
+        """
+        if self.fixed is None:
+            return np.array(F,dtype=np.float64)
+        rhs=np.asarray(F,dtype=np.float64)-self.apply(np.where(self.fixed,ubc,0.0))
+        rhs[self.fixed]=np.asarray(ubc)[self.fixed]
+        return rhs
+    def getmemory(self):
+        """
+        return the number of bytes held by the operator(connectivity and gauss point geometry)
+        """
+        return self.tensorconn.nbytes+self.G.nbytes
+    def aslinearoperator(self):
+        """
+        return the scipy LinearOperator, it can be used by the krylov solvers of scipy
+        """
+        return LinearOperator(self.shape,matvec=self.matvec,dtype=np.float64)
@@ -0,0 +1,280 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import sys
+from FEToy.fe.assembler import assemblyplan
+from FEToy.fe.geometry import geometrycache
+from FEToy.fe.linearsolver import linearsolver
+
+
+class quadraturedata:
+    def __init__(self,elements,shape_val,shape_grad,JxW,x,u,gradu,uold=None,graduold=None,dt=None):
+        """
+        the batched quadrature data of a chunk of elements, it is handed to the residual/jacobian kernels
+
+        Attributes
+        ----------
+        elements : slice or array
+            the element ids of the chunk
+        shape_val : (nElem,nqp,nNodes) array
+        shape_grad : (nElem,nqp,nNodes,dim) array
+        JxW : (nElem,nqp) array
+        x : (nElem,nqp,dim) array
+            the physical coordinates of the gauss points
+        u, uold : (nElem,nqp) array, or (nElem,nqp,dofspernode) for more than one dof per node
+            the solution of the current and the previous step on the gauss points
+        gradu, graduold : (nElem,nqp,dim) array, or (nElem,nqp,dofspernode,dim)
+            the gradient of the solution on the gauss points
+        dt : double
+            the time step size of the transient problems
+        """
+        self.elements=elements
+        self.shape_val=shape_val
+        self.shape_grad=shape_grad
+        self.JxW=JxW
+        self.x=x
+        self.u=u
+        self.gradu=gradu
+        self.uold=uold
+        self.graduold=graduold
+        self.dt=dt
+###########################################################################
+def interpolate(shape_val,shape_grad,elU):
+    """
+    interpolate the element nodal values to the gauss points
+
+    Parameters
+    ----------
+    shape_val : (nElem,nqp,nNodes) array
+    shape_grad : (nElem,nqp,nNodes,dim) array
+    elU : (nElem,nNodes,dofspernode) array
+        the nodal values of each element
+
+    Returns
+    -------
+    u : (nElem,nqp) array, or (nElem,nqp,dofspernode) for more than one dof per node
+    gradu : (nElem,nqp,dim) array, or (nElem,nqp,dofspernode,dim)
+    """
+    u=np.einsum('eqi,eic->eqc',shape_val,elU)
+    gradu=np.einsum('eqid,eic->eqcd',shape_grad,elU)
+    if elU.shape[2]==1:
+        return u[:,:,0],gradu[:,:,0,:]
+    return u,gradu
+###########################################################################
+class newtonsolver:
+    def __init__(self,mesh,shp,gpoints,kernel,bc=None,dofspernode=1,config=None,geometry=None,
+                 tolerance=1.0e-10,reltol=1.0e-15,maxiters=50,linesearch=True,modified=False,
+                 maxreuse=5,contraction=0.25,verbose=True):
+        """
+        Initialize the newton-raphson solver. The kernel works on the batched quadrature data of a chunk
+        of elements, it must offer:
+            kernel.residual(qp) -> (nElem,dofsperelement) array, the element residual R
+            kernel.jacobian(qp) -> (nElem,dofsperelement,dofsperelement) array, the element K=-dR/du
+        the same sign convention as the lecture notes, so du=K^{-1}*R and u=u+du
+
+        Parameters
+        ----------
+        mesh : mesh1d or mesh2d
+            the mesh class, createmesh() must be called before
+        shp : shape1d or shape2d
+            the shape function class
+        gpoints : gausspoint1d or gausspoint2d
+            the gauss points
+        kernel : object
+            the residual/jacobian kernel
+        bc : dirichletbc
+            the dirichlet boundary conditions
+        dofspernode : int
+            the number of dofs on each node
+        config : solverconfig
+            the linear solver configuration, superlu is used if it is None
+        geometry : geometrycache
+            the geometry cache of the mesh, a new one is created if it is None
+        tolerance : double
+            the absolute tolerance of |R|
+        reltol : double
+            the relative tolerance of |R|/|R0|
+        maxiters : int
+            the maximum newton iterations
+        linesearch : boolean
+            True to use the backtracking line search
+        modified : boolean
+            True for the modified newton, the jacobian and its factorization are reused until
+            |R_k|/|R_{k-1}|>contraction or they are reused for maxreuse iterations
+        maxreuse : int
+            the maximum iterations with the same jacobian in the modified newton
+        contraction : double
+            the contraction rate that triggers a new jacobian in the modified newton
+        verbose : boolean
+            True to print the iteration information
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the newton solver')
+        if not (hasattr(kernel,'residual') and hasattr(kernel,'jacobian')):
+            sys.exit('the kernel of the newton solver needs residual() and jacobian()')
+        self.mesh=mesh
+        self.kernel=kernel
+        self.bc=bc
+        self.dofspernode=dofspernode
+        self.plan=assemblyplan(mesh,dofspernode)
+        self.nDofs=self.plan.nDofs
+        if geometry is None:
+            geometry=geometrycache(mesh,shp,gpoints)
+        self.geometry=geometry
+        self.solver=linearsolver(config)
+        self.conn=np.asarray(mesh.elementconn,dtype=np.int64)
+        coords=np.asarray(mesh.nodecoords,dtype=np.float64)
+        self.coords=coords.reshape((mesh.nodes,-1))
+        self.tolerance=tolerance
+        self.reltol=reltol
+        self.maxiters=maxiters
+        self.linesearch=linesearch
+        self.maxlinesearch=8
+        self.modified=modified
+        self.maxreuse=maxreuse
+        self.contraction=contraction
+        self.verbose=verbose
+        self.factorizations=0
+        self.report=[]
+    def interpolate(self,shape_val,shape_grad,U,elements):
+        """
+        interpolate the nodal vector U to the gauss points of the elements
+        """
+        elU=U.reshape((self.mesh.nodes,self.dofspernode))[self.conn[elements]] # (nElem,nNodes,dofspernode)
+        return interpolate(shape_val,shape_grad,elU)
+    def quadrature(self,U,Uold,dt):
+        """
+        loop over the chunks of the geometry cache and build the quadrature data
+        """
+        for elements,shape_val,shape_grad,JxW in self.geometry.chunks():
+            x=np.einsum('eqi,eid->eqd',shape_val,self.coords[self.conn[elements]])
+            u,gradu=self.interpolate(shape_val,shape_grad,U,elements)
+            uold=None;graduold=None
+            if Uold is not None:
+                uold,graduold=self.interpolate(shape_val,shape_grad,Uold,elements)
+            yield quadraturedata(elements,shape_val,shape_grad,JxW,x,u,gradu,uold,graduold,dt)
+    def calcresidual(self,U,Uold=None,dt=None,rext=None):
+        """
+        assemble the global residual R(U)+rext
+        """
+        R=np.zeros(self.nDofs)
+        for qp in self.quadrature(U,Uold,dt):
+            self.plan.assemblevector(self.kernel.residual(qp),qp.elements,R)
+        if rext is not None:
+            R+=rext
+        return R
+    def calcjacobian(self,U,Uold=None,dt=None):
+        """
+        assemble the global jacobian K=-dR/dU as csr_matrix
+        """
+        data=np.zeros(self.plan.nnz)
+        for qp in self.quadrature(U,Uold,dt):
+            self.plan.assemblematrix(self.kernel.jacobian(qp),qp.elements,data)
+        return self.plan.creatematrix(data)
+    def factorize(self,U,Uold,dt):
+        K=self.calcjacobian(U,Uold,dt)
+        if self.bc is not None:
+            K,dummy=self.bc.reduce(K,np.zeros(self.nDofs),homogeneous=True)
+        self.solver.setup(K)
+        self.factorizations+=1
+    def reduce(self,R):
+        if self.bc is None:
+            return R
+        return R[self.bc.getfreedofs()]
+    def expand(self,du):
+        if self.bc is None:
+            return du
+        return self.bc.expand(du,homogeneous=True)
+    def solve(self,U,Uold=None,dt=None,rext=None):
+        """
+        solve R(U)+rext=0 by the newton-raphson iteration
+
+        Parameters
+        ----------
+        U : array
+            the initial guess, it is updated in place, the dirichlet values are applied to it first
+        Uold : array
+            the solution of the previous step for the transient problems
+        dt : double
+            the time step size for the transient problems
+        rext : array
+            the constant part of the residual, i.e. the surface flux
+
+        Returns
+        -------
+        U : array
+            the solution
+        converged : boolean
+            True if the iteration converges
+        """
+        if self.bc is not None:
+            self.bc.setsolution(U)
+        self.report=[]
+        R=self.calcresidual(U,Uold,dt,rext)
+        rnorm=np.linalg.norm(self.reduce(R))
+        rnorm0=rnorm;dunorm0=None;enorm0=None
+        iters=0;reuse=0;ratio=1.0;converged=False
+        while True:
+            if rnorm<self.tolerance or rnorm<=self.reltol*rnorm0:
+                converged=True
+                break
+            if iters>=self.maxiters:
+                break
+            newjacobian=(iters==0 or not self.modified or reuse>=self.maxreuse or ratio>self.contraction)
+            if newjacobian:
+                self.factorize(U,Uold,dt)
+                reuse=0
+            du,info=self.solver.solve(None,self.reduce(R))
+            du=self.expand(du)
+            alpha,Rnew,rnormnew=self.search(U,du,rnorm,Uold,dt,rext)
+            if rnormnew>=rnorm and not newjacobian:
+                # the old jacobian is too poor, try again with a new one
+                ratio=1.0
+                reuse=self.maxreuse
+                continue
+            iters+=1;reuse+=1
+            U+=alpha*du
+            dunorm=np.linalg.norm(alpha*du)
+            enorm=np.abs(np.dot(alpha*du,R))
+            if iters==1:
+                dunorm0=dunorm;enorm0=enorm
+            self.report.append({'iters':iters,'rnorm':rnorm,'dunorm':dunorm,'enorm':enorm,
+                                'alpha':alpha,'jacobian':newjacobian})
+            if self.verbose:
+                print('    iters=%3d, |R0 |=%14.5e, |R |=%14.5e'%(iters,rnorm0,rnorm))
+                print('               |dU0|=%14.5e, |dU|=%14.5e'%(dunorm0,dunorm))
+                print('               |E0 |=%14.5e, |E |=%14.5e, alpha=%6.3f'%(enorm0,enorm,alpha))
+            ratio=rnormnew/rnorm
+            R=Rnew;rnorm=rnormnew
+        if self.verbose:
+            if converged:
+                print('    newton converged: iters=%d, |R|=%14.5e, factorizations=%d'%(iters,rnorm,self.factorizations))
+            else:
+                print('    warning: newton does not converge in %d iterations, |R|=%14.5e'%(iters,rnorm))
+        return U,converged
+    def search(self,U,du,rnorm,Uold,dt,rext):
+        """
+        the backtracking line search, alpha is halved until |R(U+alpha*du)|<(1-1.0e-4*alpha)*|R(U)|
+
+        Returns
+        -------
+        alpha : double
+        R : array
+            the residual of U+alpha*du
+        rnorm : double
+            the norm of the reduced residual
+        """
+        alpha=1.0
+        for i in range(self.maxlinesearch+1):
+            R=self.calcresidual(U+alpha*du,Uold,dt,rext)
+            rnormnew=np.linalg.norm(self.reduce(R))
+            if not self.linesearch or rnormnew<(1.0-1.0e-4*alpha)*rnorm or i==self.maxlinesearch:
+                break
+            alpha*=0.5
+        return alpha,R,rnormnew
@@ -0,0 +1,370 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+import os
+import sys
+from FEToy.mesh.meshutils import validcoloring
+from FEToy.fe.assembler import assemblyplan
+from FEToy.fe.newton import quadraturedata,interpolate
+from FEToy.fe import kernels
+
+
+# the state of one worker process of the pool, it is filled by initworker(). The in-process assembler(workers=1)
+# keeps its own state, so several assemblers never share it
+workerstate={}
+
+def initworker(spec):
+    """
+    initialize one worker process with the static data of the mesh
+    """
+    workerstate.clear()
+    workerstate.update(spec)
+    workerstate['buffers']={}
+    kernels.setbackend(spec['backend'])
+
+def attach(buffer,state=None):
+    """
+    return the numpy view of one shared memory buffer (name,shape,dtype), the block is attached once per worker
+    """
+    if state is None:
+        state=workerstate
+    name,shape,dtype=buffer
+    buffers=state['buffers']
+    if name not in buffers:
+        buffers[name]=shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape,dtype=dtype,buffer=buffers[name].buf)
+
+def assemblepartition(task,state=None):
+    """
+    calculate the element residuals and matrices of the elements in [start,end) and write them
+    into the shared element buffers, the elements are handled chunk by chunk. state is the worker
+    state of the in-process assembler, the global workerstate of the pool worker is used if it is None
+    """
+    if state is None:
+        state=workerstate
+    start,end,kernel,dt,buffers=task
+    shp=state['shp'];gpoints=state['gpoints']
+    dofspernode=state['dofspernode'];chunksize=state['chunksize']
+    coords=attach(state['coords'],state);conn=attach(state['conn'],state)
+    nodecoords=coords if coords.shape[1]>1 else coords[:,0]
+    U=attach(buffers['U'],state).reshape((coords.shape[0],dofspernode))
+    Uold=None
+    if 'Uold' in buffers:
+        Uold=attach(buffers['Uold'],state).reshape((coords.shape[0],dofspernode))
+    Ke=attach(buffers['Ke'],state) if 'Ke' in buffers else None
+    Re=attach(buffers['Re'],state) if 'Re' in buffers else None
+    for s in range(start,end,chunksize):
+        e=min(s+chunksize,end)
+        elconn=conn[s:e]
+        shape_val,shape_grad,JxW=kernels.calcbatch(nodecoords,elconn,shp,gpoints)
+        x=np.einsum('eqi,eid->eqd',shape_val,coords[elconn])
+        u,gradu=interpolate(shape_val,shape_grad,U[elconn])
+        uold=None;graduold=None
+        if Uold is not None:
+            uold,graduold=interpolate(shape_val,shape_grad,Uold[elconn])
+        qp=quadraturedata(slice(s,e),shape_val,shape_grad,JxW,x,u,gradu,uold,graduold,dt)
+        if Ke is not None:
+            Ke[s:e]=kernel.jacobian(qp)
+        if Re is not None:
+            Re[s:e]=kernel.residual(qp)
+    return end-start
+###########################################################################
+class parallelassembler:
+    def __init__(self,mesh,shp,gpoints,dofspernode=1,workers=None,nparts=None,chunksize=4096,plan=None):
+        """
+        Initialize the process-pool assembler. The mesh is split into contiguous element partitions,
+        the worker processes calculate the element residuals and matrices into shared memory buffers,
+        then the parent reduces them into the global vector and CSR matrix with the assembly plan
+
+        Parameters
+        ----------
+        mesh : mesh1d or mesh2d
+            the mesh class, createmesh() must be called before
+        shp : shape1d or shape2d
+            the shape function class
+        gpoints : gausspoint1d or gausspoint2d
+            the gauss points
+        dofspernode : int
+            the number of dofs on each node
+        workers : int
+            the number of worker processes, os.cpu_count() if it is None, 1 to work in this process.
+            The workers are spawned if numba is installed, so the script needs the if __name__=='__main__' guard
+        nparts : int
+            the number of element partitions, 4*workers if it is None
+        chunksize : int
+            the number of elements calculated at once by one worker
+        plan : assemblyplan
+            the assembly plan of the mesh, a new one is created if it is None
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the parallel assembler')
+        if workers is None:
+            workers=os.cpu_count()
+        if workers<1:
+            sys.exit('the number of workers must be at least 1 in parallelassembler')
+        if plan is None:
+            plan=assemblyplan(mesh,dofspernode)
+        self.mesh=mesh
+        self.plan=plan
+        self.dofspernode=dofspernode
+        self.nDofs=plan.nDofs
+        self.dofsperelement=plan.dofsperelement
+        self.workers=workers
+        if nparts is None:
+            nparts=4*workers
+        self.setpartitions(nparts)
+        self.state=None
+        self.shm={}
+        self.buffers={}
+        coords=self.createbuffer('coords',np.asarray(mesh.nodecoords,dtype=np.float64).reshape((mesh.nodes,-1)))
+        conn=self.createbuffer('conn',np.asarray(mesh.elementconn))
+        spec={'shp':shp,'gpoints':gpoints,'dofspernode':dofspernode,'chunksize':chunksize,'backend':kernels.getbackend(),
+              'coords':self.buffers['coords'],'conn':self.buffers['conn']}
+        if workers==1:
+            # the in-process state holds the shared memory handles of this assembler
+            self.state=dict(spec)
+            self.state['buffers']={self.buffers[key][0]:self.shm[key] for key in ['coords','conn']}
+            self.pool=None
+        else:
+            # the threading layer of numba is not fork-safe, the workers are spawned if it may be active
+            context=multiprocessing.get_context('spawn' if kernels.njit is not None else None)
+            self.pool=context.Pool(workers,initializer=initworker,initargs=(spec,))
+    def setpartitions(self,nparts):
+        """
+        split the elements into nparts contiguous partitions, [(start,end),...]
+        """
+        bounds=np.linspace(0,self.mesh.elements,min(max(nparts,1),self.mesh.elements)+1).astype(np.int64)
+        self.partitions=[(int(bounds[i]),int(bounds[i+1])) for i in range(bounds.size-1)]
+    def createbuffer(self,key,value=None,shape=None,dtype=np.float64):
+        """
+        create one shared memory buffer, it is filled with value if it is given
+        """
+        if value is not None:
+            shape=value.shape;dtype=value.dtype
+        nbytes=max(int(np.prod(shape))*np.dtype(dtype).itemsize,1)
+        shm=shared_memory.SharedMemory(create=True,size=nbytes)
+        array=np.ndarray(shape,dtype=dtype,buffer=shm.buf)
+        if value is not None:
+            array[...]=value
+        self.shm[key]=shm
+        self.buffers[key]=(shm.name,shape,np.dtype(dtype).str)
+        if self.state is not None:
+            self.state['buffers'][shm.name]=shm
+        return array
+    def getbuffer(self,key,shape):
+        """
+        return the shared buffer of the given key, it is created at the first use
+        """
+        if key not in self.shm:
+            return self.createbuffer(key,shape=shape)
+        name,shape,dtype=self.buffers[key]
+        return np.ndarray(shape,dtype=dtype,buffer=self.shm[key].buf)
+    def assemble(self,kernel,U=None,Uold=None,dt=None,matrix=True,vector=True):
+        """
+        assemble the global matrix and vector in parallel
+
+        Parameters
+        ----------
+        kernel : object
+            the element kernel with residual(qp) and jacobian(qp), see newtonsolver, it must be picklable
+            (i.e. an instance of a module level class) to be sent to the worker processes
+        U : array
+            the current solution, zero if it is None
+        Uold : array
+            the solution of the previous step for the transient problems
+        dt : double
+            the time step size for the transient problems
+        matrix : boolean
+            True to assemble the matrix from kernel.jacobian
+        vector : boolean
+            True to assemble the vector from kernel.residual
+
+        Returns
+        -------
+        K : csr_matrix or None
+        R : array or None
+        """
+        if self.shm is None:
+            sys.exit('the parallel assembler is already closed!')
+        nE=self.mesh.elements;nd=self.dofsperelement
+        buffers={}
+        Ushared=self.getbuffer('U',(self.nDofs,))
+        Ushared[:]=0.0 if U is None else U
+        buffers['U']=self.buffers['U']
+        if Uold is not None:
+            self.getbuffer('Uold',(self.nDofs,))[:]=Uold
+            buffers['Uold']=self.buffers['Uold']
+        if matrix:
+            Ke=self.getbuffer('Ke',(nE,nd,nd))
+            buffers['Ke']=self.buffers['Ke']
+        if vector:
+            Re=self.getbuffer('Re',(nE,nd))
+            buffers['Re']=self.buffers['Re']
+        tasks=[(start,end,kernel,dt,buffers) for start,end in self.partitions]
+        if self.pool is None:
+            for task in tasks:
+                assemblepartition(task,self.state)
+        else:
+            self.pool.map(assemblepartition,tasks,chunksize=1)
+        K=None;R=None
+        if matrix:
+            K=self.plan.creatematrix(self.plan.assemblematrix(Ke))
+        if vector:
+            R=self.plan.assemblevector(Re)
+        return K,R
+    def close(self):
+        """
+        stop the worker processes and release the shared memory
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool=None
+        if self.shm is not None:
+            for shm in self.shm.values():
+                shm.close()
+                shm.unlink()
+            self.shm=None
+        self.state=None
+    def __enter__(self):
+        return self
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+        return False
+###########################################################################
+class coloredassembler:
+    def __init__(self,mesh,shp,gpoints,dofspernode=1,workers=None,chunksize=4096,plan=None,geometry=None):
+        """
+        Initialize the threaded assembler based on the element coloring of the mesh. The colors are
+        handled one after another, the elements of one color are split into chunks and calculated by
+        a thread pool, each thread adds its element matrices directly into the global arrays. Since
+        no two elements of the same color share a node, they never touch the same entry, so there are
+        neither locks nor per-thread copies of the global arrays. The numpy kernels release the GIL
+
+        Parameters
+        ----------
+        mesh : mesh1d or mesh2d
+            the mesh class, createmesh() must be called before
+        shp : shape1d or shape2d
+            the shape function class
+        gpoints : gausspoint1d or gausspoint2d
+            the gauss points
+        dofspernode : int
+            the number of dofs on each node
+        workers : int
+            the number of threads, os.cpu_count() if it is None
+        chunksize : int
+            the number of elements calculated at once by one thread
+        plan : assemblyplan
+            the assembly plan of the mesh, a new one is created if it is None
+        geometry : geometrycache
+            the geometry cache of the mesh, the shape functions are calculated chunk by chunk if it is None
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the colored assembler')
+        if workers is None:
+            workers=os.cpu_count()
+        if plan is None:
+            plan=assemblyplan(mesh,dofspernode)
+        if geometry is not None and not geometry.cached:
+            geometry=None
+        self.mesh=mesh
+        self.shp=shp
+        self.gpoints=gpoints
+        self.plan=plan
+        self.geometry=geometry
+        self.dofspernode=dofspernode
+        self.nDofs=plan.nDofs
+        self.workers=workers
+        self.chunksize=chunksize
+        self.conn=np.asarray(mesh.elementconn,dtype=np.int64)
+        coords=np.asarray(mesh.nodecoords,dtype=np.float64)
+        self.coords=coords.reshape((mesh.nodes,-1))
+        self.nodecoords=coords
+        if not validcoloring(mesh):
+            mesh.colorelements()
+        self.chunks=[]
+        for group in mesh.colorgroups:
+            self.chunks.append([group[s:s+chunksize] for s in range(0,group.size,chunksize)])
+        self.pool=ThreadPoolExecutor(max_workers=workers)
+    def assemblechunk(self,elements,kernel,U,Uold,dt,data,rhs):
+        """
+        calculate the elements of one chunk(all of the same color) and add them to the global arrays
+        """
+        elconn=self.conn[elements]
+        if self.geometry is None:
+            shape_val,shape_grad,JxW=kernels.calcbatch(self.nodecoords,elconn,self.shp,self.gpoints)
+        else:
+            shape_val,shape_grad,JxW=self.geometry.shape_val[elements],self.geometry.shape_grad[elements],self.geometry.JxW[elements]
+        x=np.einsum('eqi,eid->eqd',shape_val,self.coords[elconn])
+        u,gradu=interpolate(shape_val,shape_grad,U[elconn])
+        uold=None;graduold=None
+        if Uold is not None:
+            uold,graduold=interpolate(shape_val,shape_grad,Uold[elconn])
+        qp=quadraturedata(elements,shape_val,shape_grad,JxW,x,u,gradu,uold,graduold,dt)
+        scatter,elementdofs=self.plan.getscatter(elements)
+        # the entries of one color are unique, so the buffered fancy-index add is exact
+        if data is not None:
+            data[scatter]+=kernel.jacobian(qp).reshape(scatter.shape)
+        if rhs is not None:
+            rhs[elementdofs]+=kernel.residual(qp)
+    def assemble(self,kernel,U=None,Uold=None,dt=None,matrix=True,vector=True):
+        """
+        assemble the global matrix and vector with the thread pool
+
+        Parameters
+        ----------
+        kernel : object
+            the element kernel with residual(qp) and jacobian(qp), see newtonsolver
+        U : array
+            the current solution, zero if it is None
+        Uold : array
+            the solution of the previous step for the transient problems
+        dt : double
+            the time step size for the transient problems
+        matrix : boolean
+            True to assemble the matrix from kernel.jacobian
+        vector : boolean
+            True to assemble the vector from kernel.residual
+
+        Returns
+        -------
+        K : csr_matrix or None
+        R : array or None
+        """
+        if self.pool is None:
+            sys.exit('the colored assembler is already closed!')
+        nodes=self.mesh.nodes
+        U=np.zeros((nodes,self.dofspernode)) if U is None else np.asarray(U,dtype=np.float64).reshape((nodes,self.dofspernode))
+        if Uold is not None:
+            Uold=np.asarray(Uold,dtype=np.float64).reshape((nodes,self.dofspernode))
+        data=np.zeros(self.plan.nnz) if matrix else None
+        rhs=np.zeros(self.nDofs) if vector else None
+        for chunks in self.chunks:
+            # the colors are processed one after another
+            futures=[self.pool.submit(self.assemblechunk,elements,kernel,U,Uold,dt,data,rhs) for elements in chunks]
+            for future in futures:
+                future.result()
+        K=self.plan.creatematrix(data) if matrix else None
+        return K,rhs
+    def close(self):
+        """
+        stop the thread pool
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool=None
+    def __enter__(self):
+        return self
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+        return False
@@ -9,6 +9,70 @@ __date__ = "Dec 25, 2021"
 import numpy as np
 import matplotlib.pyplot as plt
 import sys
+from collections import OrderedDict
+
+
+class shapecache:
+    def __init__(self,maxsize=32):
+        """
+        Initialize the tabulation cache of the reference shape functions, the tables are
+        keyed by (meshtype,ngp) and the least recently used one is dropped beyond maxsize
+
+        Parameters
+        ----------
+        maxsize : int
+            the maximum number of tables kept in the cache
+        """
+        self.maxsize=maxsize
+        self.tables=OrderedDict()
+    def setmaxsize(self,maxsize):
+        """
+        set up the maximum number of tables kept in the cache
+        """
+        self.maxsize=maxsize
+        while len(self.tables)>self.maxsize:
+            self.tables.popitem(last=False)
+    def clear(self):
+        """
+        remove all the tables
+        """
+        self.tables.clear()
+    def get(self,shp,gpoints):
+        """
+        get the shape function value and its local derivative on the gauss points
+
+        Parameters
+        ----------
+        shp : shape1d or shape2d
+            the shape function class
+        gpoints : gausspoint1d or gausspoint2d
+            the gauss points
+
+        Returns
+        -------
+        shape_val : (nqp,nNodes) read-only array
+        shape_grad : (nqp,nNodes) or (nqp,nNodes,2) read-only array
+        """
+        key=(shp.meshtype,gpoints.ngp)
+        table=self.tables.get(key)
+        if table is not None and np.array_equal(table[0],gpoints.gpcoords):
+            self.tables.move_to_end(key)
+            return table[1],table[2]
+        gpcoords=np.array(gpoints.gpcoords)
+        if gpcoords.shape[1]==2:
+            shape_val,shape_grad=shp.calclocal(gpcoords[:,1])
+        else:
+            shape_val,shape_grad=shp.calclocal(gpcoords[:,1],gpcoords[:,2])
+        for array in (gpcoords,shape_val,shape_grad):
+            array.setflags(write=False)
+        self.tables[key]=(gpcoords,shape_val,shape_grad)
+        self.tables.move_to_end(key)
+        while len(self.tables)>self.maxsize:
+            self.tables.popitem(last=False)
+        return shape_val,shape_grad
+
+# the tabulation cache shared by all the shape function classes
+tabulationcache=shapecache()
 
 
 class shape1d:
@@ -111,6 +175,137 @@ class shape1d:
                 self.shape_grad[i]=self.shape_grad[i]/self.jacdet
 
         return self.shape_val,self.shape_grad,self.jacdet
+    ###########################################################
+    def calclocal(self,xi):
+        """
+        calculate the shape function value and its derivative w.r.t xi for a set of local points
+
+        Parameters
+        ----------
+        xi : vector
+            the local coordinates
+
+        Returns
+        -------
+        shape_val : (nqp,nNodes) array
+        shape_grad : (nqp,nNodes) array, the derivative w.r.t xi
+        """
+        xi=np.atleast_1d(np.asarray(xi,dtype=np.float64))
+        shape_val=np.zeros((xi.size,self.nNodes))
+        shape_grad=np.zeros((xi.size,self.nNodes))
+        if self.nNodes==2:
+            shape_val[:,0]=0.5*(1.0-xi)
+            shape_grad[:,0]=-0.5
+
+            shape_val[:,1]=0.5*(1.0+xi)
+            shape_grad[:,1]=0.5
+        elif self.nNodes==3:
+            shape_val[:,0]=0.5*xi*(xi-1.0)
+            shape_grad[:,0]=0.5*(2*xi-1)
+
+            shape_val[:,1]=-(xi+1.0)*(xi-1.0)
+            shape_grad[:,1]=-2.0*xi
+
+            shape_val[:,2]=0.5*xi*(xi+1.0)
+            shape_grad[:,2]=0.5*(2.0*xi+1.0)
+        elif self.nNodes==4:
+            shape_val[:,0]=-(3.0*xi+1.0)*(3.0*xi-1.0)*(    xi-1.0)/16.0
+            shape_grad[:,0]=-27.0*xi*xi/16.0+9.0*xi/8.0+ 1.0/16.0
+
+            shape_val[:,1]=(3.0*xi+3.0)*(3.0*xi-1.0)*(3.0*xi-3.0)/16.0
+            shape_grad[:,1]= 81.0*xi*xi/16.0-9.0*xi/8.0-27.0/16.0
+
+            shape_val[:,2]=-(3.0*xi+3.0)*(3.0*xi+1.0)*(3.0*xi-3.0)/16.0
+            shape_grad[:,2]=-81.0*xi*xi/16.0-9.0*xi/8.0+27.0/16.0
+
+            shape_val[:,3]=(    xi+1.0)*(3.0*xi+1.0)*(3.0*xi-1.0)/16.0
+            shape_grad[:,3]=27.0*xi*xi/16.0+9.0*xi/8.0- 1.0/16.0
+        else:
+            sys.exit('unsupported shape function calculation in shape1d')
+        return shape_val,shape_grad
+    def tabulate(self,gpoints):
+        """
+        get the shape function value and its derivative w.r.t xi on all the gauss points from the tabulation cache
+
+        Parameters
+        ----------
+        gpoints : gausspoint1d
+            the 1d gauss points
+        """
+        return tabulationcache.get(self,gpoints)
+    def calcgp(self,gpoints,gp,x,flag=True):
+        """
+        calculate the shape function value and its derivative on the gp-th gauss point,
+        the same as calc, but the reference values come from the tabulation cache
+
+        Parameters
+        ----------
+        gpoints : gausspoint1d
+            the 1d gauss points
+        gp : int
+            the gauss point index
+        x : vector
+            the global coordinate
+        flag : boolean
+            True for the calculation based on global coordinate, otherwise, it use the local one
+        """
+        shp_val,shp_grad=self.tabulate(gpoints)
+        self.shape_val[:]=shp_val[gp]
+        dxdxi=np.dot(shp_grad[gp],x)
+        self.jacdet=np.abs(dxdxi)
+        if self.jacdet<1.0e-16:
+            sys.exit('error: you have one singular 1d mesh !!!')
+        if flag==True:
+            self.shape_grad[:]=shp_grad[gp]/self.jacdet
+        else:
+            self.shape_grad[:]=shp_grad[gp]
+        return self.shape_val,self.shape_grad,self.jacdet
+    def calcbatch(self,nodecoords,elementconn,gpoints,flag=True):
+        """
+        calculate the shape functions of all the elements on all the gauss points at once
+
+        Parameters
+        ----------
+        nodecoords : array
+            the node coordinates of the mesh, (nodes,) for 1d mesh, (nodes,dim) for line elements in 2d
+        elementconn : array
+            the element connectivity, (nElem,nNodes), it can also be the bcconn of a 2d mesh
+        gpoints : gausspoint1d
+            the 1d gauss points
+        flag : boolean
+            True for the derivative w.r.t global coordinate(arc length for line elements in 2d), otherwise, the local one
+
+        Returns
+        -------
+        shape_val : (nElem,nqp,nNodes) array, a read-only view of the tabulated values
+        shape_grad : (nElem,nqp,nNodes,1) array
+        JxW : (nElem,nqp) array, the jacobian determinate times the gauss point weight
+        """
+        conn=np.asarray(elementconn)
+        if conn.ndim==1:
+            conn=conn.reshape((1,-1))
+        if not conn.shape[1]==self.nNodes:
+            sys.exit('the element connectivity does not match with the mesh type in shape1d->calcbatch')
+        shp_val,shp_grad=self.tabulate(gpoints)
+        coords=np.asarray(nodecoords,dtype=np.float64)[conn] # (nElem,nNodes) or (nElem,nNodes,dim)
+        if coords.ndim==2:
+            dxdxi=np.dot(coords,shp_grad.T) # (nElem,nqp)
+            jacdet=np.abs(dxdxi)
+        else:
+            dxdxi=np.einsum('qn,end->eqd',shp_grad,coords)
+            jacdet=np.sqrt(np.sum(dxdxi*dxdxi,axis=2))
+            dxdxi=jacdet
+        if np.any(jacdet<1.0e-16):
+            sys.exit('error: you have one singular 1d mesh !!!')
+
+        nElem=conn.shape[0]
+        shape_val=np.broadcast_to(shp_val,(nElem,)+shp_val.shape)
+        if flag==True:
+            shape_grad=shp_grad[None,:,:]/dxdxi[:,:,None]
+        else:
+            shape_grad=np.broadcast_to(shp_grad,(nElem,)+shp_grad.shape)
+        JxW=jacdet*gpoints.gpcoords[:,0]
+        return shape_val,shape_grad[:,:,:,None],JxW
     def plot(self):
         """
         plot the 1d shape function
@@ -254,11 +449,12 @@ class shape2d:
             dydxi +=self.shape_grad[i,0]*y[i]
             dydeta+=self.shape_grad[i,1]*y[i]
         
-        jac=np.array([[dxdxi,dydxi],[dxdeta,dydeta]])
-        self.jacdet=np.linalg.det(jac)
-        xjac=np.linalg.inv(jac)
+        # closed-form determinate and inverse of jac=[[dxdxi,dydxi],[dxdeta,dydeta]]
+        self.jacdet=dxdxi*dydeta-dydxi*dxdeta
         if self.jacdet<1.0e-16:
             sys.exit('error: you have one singular 1d mesh !!!')
+        xjac=np.array([[ dydeta,-dydxi],
+                       [-dxdeta, dxdxi]])/self.jacdet
         if flag==True:
             for i in range(self.nNodes):
                 temp1=self.shape_grad[i,1-1]*xjac[0,0]+self.shape_grad[i,2-1]*xjac[0,1]
@@ -267,6 +463,178 @@ class shape2d:
                 self.shape_grad[i,2-1]=temp2
 
         return self.shape_val,self.shape_grad,self.jacdet
+    ###########################################################
+    def calclocal(self,xi,eta):
+        """
+        calculate the shape function value and its derivative w.r.t (xi,eta) for a set of local points
+
+        Parameters
+        ----------
+        xi : vector
+            the local coordinates
+        eta : vector
+            the local coordinates
+
+        Returns
+        -------
+        shape_val : (nqp,nNodes) array
+        shape_grad : (nqp,nNodes,2) array, the derivative w.r.t (xi,eta)
+        """
+        xi=np.atleast_1d(np.asarray(xi,dtype=np.float64))
+        eta=np.atleast_1d(np.asarray(eta,dtype=np.float64))
+        shape_val=np.zeros((xi.size,self.nNodes))
+        shape_grad=np.zeros((xi.size,self.nNodes,2))
+        if self.nNodes==4:
+            shape_val[:,0]=(1.0-xi)*(1.0-eta)/4.0
+            shape_val[:,1]=(1.0+xi)*(1.0-eta)/4.0
+            shape_val[:,2]=(1.0+xi)*(1.0+eta)/4.0
+            shape_val[:,3]=(1.0-xi)*(1.0+eta)/4.0
+
+            shape_grad[:,0,0]= (eta-1.0)/4.0
+            shape_grad[:,0,1]= (xi -1.0)/4.0
+
+            shape_grad[:,1,0]= (1.0-eta)/4.0
+            shape_grad[:,1,1]=-(1.0+xi )/4.0
+
+            shape_grad[:,2,0]= (1.0+eta)/4.0
+            shape_grad[:,2,1]= (1.0+xi )/4.0
+
+            shape_grad[:,3,0]=-(1.0+eta)/4.0
+            shape_grad[:,3,1]= (1.0-xi )/4.0
+        elif self.nNodes==9:
+            shape_val[:,0]=(xi*xi-xi )*(eta*eta-eta)/4.0
+            shape_val[:,1]=(xi*xi+xi )*(eta*eta-eta)/4.0
+            shape_val[:,2]=(xi*xi+xi )*(eta*eta+eta)/4.0
+            shape_val[:,3]=(xi*xi-xi )*(eta*eta+eta)/4.0
+            shape_val[:,4]=(1.0-xi*xi)*(eta*eta-eta)/2.0
+            shape_val[:,5]=(xi*xi+xi )*(1.0-eta*eta)/2.0
+            shape_val[:,6]=(1.0-xi*xi)*(eta*eta+eta)/2.0
+            shape_val[:,7]=(xi*xi-xi )*(1.0-eta*eta)/2.0
+            shape_val[:,8]=(1.0-xi*xi)*(1.0-eta*eta)
+
+            shape_grad[:,0,0]=(2.0*xi-1.0)*(eta*eta-eta)/4.0
+            shape_grad[:,0,1]=(xi*xi-xi  )*(2.0*eta-1.0)/4.0
+
+            shape_grad[:,1,0]=(2.0*xi+1.0)*(eta*eta-eta)/4.0
+            shape_grad[:,1,1]=(xi*xi+xi  )*(2.0*eta-1.0)/4.0
+
+            shape_grad[:,2,0]=(2.0*xi+1.0)*(eta*eta+eta)/4.0
+            shape_grad[:,2,1]=(xi*xi+xi  )*(2.0*eta+1.0)/4.0
+
+            shape_grad[:,3,0]=(2.0*xi-1.0)*(eta*eta+eta)/4.0
+            shape_grad[:,3,1]=(xi*xi-xi  )*(2.0*eta+1.0)/4.0
+
+            shape_grad[:,4,0]=-xi*(eta*eta-eta)
+            shape_grad[:,4,1]=(1.0-xi*xi )*(2.0*eta-1.0)/2.0
+
+            shape_grad[:,5,0]=(2.0*xi+1.0)*(1.0-eta*eta)/2.0
+            shape_grad[:,5,1]=-(xi*xi+xi )*eta
+
+            shape_grad[:,6,0]=-xi*(eta*eta+eta)
+            shape_grad[:,6,1]=(1.0-xi*xi )*(2.0*eta+1.0)/2.0
+
+            shape_grad[:,7,0]=(2.0*xi-1.0)*(1.0-eta*eta)/2.0
+            shape_grad[:,7,1]=-(xi*xi-xi )*eta
+
+            shape_grad[:,8,0]=-2.0*xi*(1.0-eta*eta)
+            shape_grad[:,8,1]=-2.0*eta*(1.0-xi*xi)
+        else:
+            sys.exit('unsupported shape function calculation in shape2d')
+        return shape_val,shape_grad
+    def tabulate(self,gpoints):
+        """
+        get the shape function value and its derivative w.r.t (xi,eta) on all the gauss points from the tabulation cache
+
+        Parameters
+        ----------
+        gpoints : gausspoint2d
+            the 2d gauss points
+        """
+        return tabulationcache.get(self,gpoints)
+    def calcgp(self,gpoints,gp,x,y,flag=True):
+        """
+        calculate the shape function value and its derivative on the gp-th gauss point,
+        the same as calc, but the reference values come from the tabulation cache
+
+        Parameters
+        ----------
+        gpoints : gausspoint2d
+            the 2d gauss points
+        gp : int
+            the gauss point index
+        x : vector
+            the global coordinate
+        y : vector
+            the global coordinate
+        flag : boolean
+            True for the calculation based on global coordinate, otherwise, it use the local one
+        """
+        shp_val,shp_grad=self.tabulate(gpoints)
+        dN=shp_grad[gp] # (nNodes,2)
+        self.shape_val[:]=shp_val[gp]
+        dxdxi,dxdeta=np.dot(x,dN)
+        dydxi,dydeta=np.dot(y,dN)
+        self.jacdet=dxdxi*dydeta-dydxi*dxdeta
+        if self.jacdet<1.0e-16:
+            sys.exit('error: you have one singular 2d mesh !!!')
+        if flag==True:
+            self.shape_grad[:,0]=( dydeta*dN[:,0]-dydxi*dN[:,1])/self.jacdet
+            self.shape_grad[:,1]=(-dxdeta*dN[:,0]+dxdxi*dN[:,1])/self.jacdet
+        else:
+            self.shape_grad[:,:]=dN
+        return self.shape_val,self.shape_grad,self.jacdet
+    def calcbatch(self,nodecoords,elementconn,gpoints,flag=True):
+        """
+        calculate the shape functions of all the elements on all the gauss points at once
+
+        Parameters
+        ----------
+        nodecoords : array
+            the node coordinates of the mesh, (nodes,2)
+        elementconn : array
+            the element connectivity, (nElem,nNodes)
+        gpoints : gausspoint2d
+            the 2d gauss points
+        flag : boolean
+            True for the derivative w.r.t global coordinate, otherwise, it use the local one
+
+        Returns
+        -------
+        shape_val : (nElem,nqp,nNodes) array, a read-only view of the tabulated values
+        shape_grad : (nElem,nqp,nNodes,2) array
+        JxW : (nElem,nqp) array, the jacobian determinate times the gauss point weight
+        """
+        conn=np.asarray(elementconn)
+        if conn.ndim==1:
+            conn=conn.reshape((1,-1))
+        if not conn.shape[1]==self.nNodes:
+            sys.exit('the element connectivity does not match with the mesh type in shape2d->calcbatch')
+        shp_val,shp_grad=self.tabulate(gpoints)
+        x=nodecoords[conn,0] # (nElem,nNodes)
+        y=nodecoords[conn,1]
+
+        # the components of jac=[[dxdxi,dydxi],[dxdeta,dydeta]] on all the gauss points, (nElem,nqp)
+        dxdxi =np.dot(x,shp_grad[:,:,0].T)
+        dxdeta=np.dot(x,shp_grad[:,:,1].T)
+        dydxi =np.dot(y,shp_grad[:,:,0].T)
+        dydeta=np.dot(y,shp_grad[:,:,1].T)
+        jacdet=dxdxi*dydeta-dydxi*dxdeta
+        if np.any(jacdet<1.0e-16):
+            sys.exit('error: you have one singular 2d mesh !!!')
+
+        nElem=conn.shape[0]
+        shape_val=np.broadcast_to(shp_val,(nElem,)+shp_val.shape)
+        if flag==True:
+            # closed-form inverse: xjac=[[dydeta,-dydxi],[-dxdeta,dxdxi]]/jacdet
+            dNdxi =shp_grad[None,:,:,0]
+            dNdeta=shp_grad[None,:,:,1]
+            shape_grad=np.empty((nElem,)+shp_grad.shape)
+            shape_grad[:,:,:,0]=( dydeta[:,:,None]*dNdxi-dydxi[:,:,None]*dNdeta)/jacdet[:,:,None]
+            shape_grad[:,:,:,1]=(-dxdeta[:,:,None]*dNdxi+dxdxi[:,:,None]*dNdeta)/jacdet[:,:,None]
+        else:
+            shape_grad=np.broadcast_to(shp_grad,(nElem,)+shp_grad.shape)
+        JxW=jacdet*gpoints.gpcoords[:,0]
+        return shape_val,shape_grad,JxW
     def plot(self):
         """
         plot the 2d shape function
@@ -0,0 +1,306 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator,splu
+import sys
+from FEToy.fe import kernels
+from FEToy.fe.shapefun import shape1d
+from FEToy.fe.assembler import assemblyplan
+from FEToy.mesh.lagrange2dmesh import mesh2d
+
+
+def isuniform(mesh):
+    """
+    return True if the mesh is a structured grid of identical elements
+    """
+    return getattr(mesh,'structured',False) and getattr(mesh,'uniform',False)
+
+def referencematrices(mesh,shp,gpoints):
+    """
+    calculate the stiffness matrix(grad N_i.grad N_j) and the mass matrix(N_i*N_j) of one element,
+    on a uniform mesh they are the same for all the elements
+
+    Parameters
+    ----------
+    mesh : mesh1d or mesh2d
+        the uniform mesh
+    shp : shape1d or shape2d
+        the shape function class
+    gpoints : gausspoint1d or gausspoint2d
+        the gauss points
+
+    Returns
+    -------
+    Ke : (nNodes,nNodes) array
+    Me : (nNodes,nNodes) array
+    """
+    if not isuniform(mesh):
+        sys.exit('the mesh is not uniform, the element matrices can not be shared')
+    shp_val,shp_grad,JxW=kernels.calcbatch(mesh.nodecoords,mesh.elementconn[:1],shp,gpoints)
+    Ke=kernels.scalarbatch(shp_val,shp_grad,JxW,a=0.0,b=1.0)[0]
+    Me=kernels.scalarbatch(shp_val,shp_grad,JxW,a=1.0,b=0.0)[0]
+    return Ke,Me
+
+def assembleuniform(plan,Ke,data=None):
+    """
+    assemble the same element matrix of all the elements into the CSR data array
+
+    Parameters
+    ----------
+    plan : assemblyplan
+        the assembly plan of the mesh
+    Ke : (dofsperelement,dofsperelement) array
+        the element matrix
+    data : array
+        the CSR data array to add to, a new one is created if it is None
+    """
+    Ke=np.asarray(Ke,dtype=np.float64).ravel()
+    values=np.bincount(plan.scatter.ravel(),weights=np.tile(Ke,plan.elements),minlength=plan.nnz)
+    if data is None:
+        return values
+    data+=values
+    return data
+
+class stenciloperator:
+    def __init__(self,mesh,Ke,fixednodes=None):
+        """
+        Initialize the matrix-free operator y=K*u of a uniform 2d mesh(one dof per node). The element
+        matrix is applied to the node grid by strided slices, which is the 9-point stencil for quad4
+        (and its equivalent for quad9), so the global matrix is never stored
+
+        Parameters
+        ----------
+        mesh : mesh2d
+            the uniform 2d mesh
+        Ke : (nNodes,nNodes) array
+            the element matrix, i.e. Ke for poisson, Me/dt+D*Ke for diffusion
+        fixednodes : array
+            the dirichlet nodes, their rows and columns are replaced by the identity
+        """
+        if not (isuniform(mesh) and mesh.dim==2):
+            sys.exit('the stencil operator only works for the uniform 2d mesh')
+        self.mesh=mesh
+        self.Ke=np.asarray(Ke,dtype=np.float64)
+        if not self.Ke.shape==(mesh.nodesperelement,mesh.nodesperelement):
+            sys.exit('the shape of Ke does not match with the mesh in stenciloperator')
+        p=mesh.order
+        self.gridshape=(p*mesh.ny+1,p*mesh.nx+1)
+        self.slices=[(slice(b,b+p*mesh.ny,p),slice(a,a+p*mesh.nx,p)) for a,b in mesh.localnodes]
+        self.shape=(mesh.nodes,mesh.nodes)
+        self.setfixednodes(fixednodes)
+    def setfixednodes(self,fixednodes):
+        """
+        set up the dirichlet nodes, None to remove them
+        """
+        self.fixed=None
+        if fixednodes is not None:
+            self.fixed=np.zeros(self.mesh.nodes,dtype=bool)
+            self.fixed[np.asarray(fixednodes)]=True
+            self.fixed=self.fixed.reshape(self.gridshape)
+    def apply(self,u):
+        """
+        calculate y=K*u without the dirichlet nodes
+        """
+        U=np.asarray(u,dtype=np.float64).reshape(self.gridshape)
+        Y=np.zeros(self.gridshape)
+        # gather the (ny,nx) grid of each local node, then all the element products are one matrix product
+        n=len(self.slices)
+        V=np.empty((n,self.mesh.ny,self.mesh.nx))
+        for j in range(n):
+            V[j]=U[self.slices[j]]
+        W=self.Ke.dot(V.reshape((n,-1))).reshape(V.shape)
+        for i in range(n):
+            Y[self.slices[i]]+=W[i]
+        return Y.ravel()
+    def matvec(self,u):
+        """
+        calculate y=K*u, the rows and columns of the dirichlet nodes are the identity
+        """
+        if self.fixed is None:
+            return self.apply(u)
+        U=np.asarray(u,dtype=np.float64).reshape(self.gridshape)
+        Y=self.apply(np.where(self.fixed,0.0,U)).reshape(self.gridshape)
+        Y[self.fixed]=U[self.fixed]
+        return Y.ravel()
+    def diagonal(self):
+        """
+        return the diagonal of K, i.e. for the jacobi preconditioner
+        """
+        D=np.zeros(self.gridshape)
+        for i in range(len(self.slices)):
+            D[self.slices[i]]+=self.Ke[i,i]
+        if self.fixed is not None:
+            D[self.fixed]=1.0
+        return D.ravel()
+    def liftrhs(self,F,ubc):
+        """
+        move the dirichlet values to the rhs, the system matvec(u)=rhs then gives u=ubc on the dirichlet nodes
+
+        Parameters
+        ----------
+        F : array
+            the rhs vector
+        ubc : array
+            the vector holding the dirichlet values on the dirichlet nodes
+        """
+        if self.fixed is None:
+            return np.array(F,dtype=np.float64)
+        fixed=self.fixed.ravel()
+        rhs=np.asarray(F,dtype=np.float64)-self.apply(np.where(fixed,ubc,0.0))
+        rhs[fixed]=np.asarray(ubc)[fixed]
+        return rhs
+    def multigrid(self,**kwargs):
+        """
+        return the geometric multigrid preconditioner of the operator, see multigrid
+        """
+        return multigrid(self,**kwargs)
+    def aslinearoperator(self):
+        """
+        return the scipy LinearOperator, it can be used by the krylov solvers of scipy
+        """
+        return LinearOperator(self.shape,matvec=self.matvec,dtype=np.float64)
+###########################################################################
+def prolongation1d(nc,p):
+    """
+    the 1d prolongation of the lagrange elements of order p from nc coarse elements(p*nc+1 nodes)
+    to 2*nc fine elements(2*p*nc+1 nodes), the fine nodes get the values of the coarse basis
+
+    Returns
+    -------
+    P1 : (2p+1,p+1) array, the coarse basis of one coarse element on its 2p+1 fine nodes
+    P : (2*p*nc+1,p*nc+1) csr_matrix
+    """
+    shp=shape1d(meshtype='edge%d'%(p+1))
+    shp.update()
+    P1,dP1=shp.calclocal(-1.0+np.arange(2*p+1)/p)
+    P1[np.abs(P1)<1.0e-14]=0.0
+    # the fine node shared by two coarse elements is taken from the left one
+    c,k,j=np.meshgrid(np.arange(nc),np.arange(2*p+1),np.arange(p+1),indexing='ij')
+    keep=(k<2*p)|(c==nc-1)
+    rows=(2*p*c+k)[keep];cols=(p*c+j)[keep];vals=P1[k,j][keep]
+    nonzero=~(vals==0.0)
+    P=sp.csr_matrix((vals[nonzero],(rows[nonzero],cols[nonzero])),shape=(2*p*nc+1,p*nc+1))
+    return P1,P
+
+def coarsematrix(mesh,Ke):
+    """
+    the element matrix of the coarse element made of 2x2 fine elements(Galerkin, Kc=sum P^T*Ke*P), the coarse
+    lagrange space is nested in the fine one, so it is the element matrix of the same bilinear form on the coarse element
+    """
+    p=mesh.order
+    P1,P=prolongation1d(1,p)
+    Kc=np.zeros_like(Ke)
+    for sx in range(2):
+        for sy in range(2):
+            # the coarse basis on the local nodes of the fine sub-element (sx,sy)
+            Ps=np.array([[P1[p*sx+a,ac]*P1[p*sy+b,bc] for ac,bc in mesh.localnodes] for a,b in mesh.localnodes])
+            Kc+=Ps.T.dot(Ke).dot(Ps)
+    return Kc
+
+class multigrid:
+    def __init__(self,op,smoothing=2,omega=None,coarsenodes=4096):
+        """
+        Initialize the geometric multigrid V-cycle of a stencil operator, the preconditioner of the krylov
+        solvers. The uniform grid is coarsened by 2 in each direction as long as nx and ny are even, the
+        coarse element matrices are the Galerkin ones, the prolongation is the lagrange interpolation of the
+        coarse elements(two 1d sparse matrices), damped jacobi is the smoother and the coarsest grid is
+        solved by superlu. Only the stencils are stored on each level
+
+        Parameters
+        ----------
+        op : stenciloperator
+            the operator of the fine grid, the dirichlet nodes are restricted to the coarse grids by injection,
+            which is exact for the dirichlet conditions on whole sides
+        smoothing : int
+            the number of jacobi sweeps before and after the coarse grid correction
+        omega : double
+            the damping of the jacobi smoother, 2/3 for quad4 and 0.6 for quad9 if it is None
+        coarsenodes : int
+            the coarsening stops once a grid has no more than coarsenodes nodes
+        """
+        if omega is None:
+            omega=2.0/3.0 if op.mesh.order==1 else 0.6
+        self.smoothing=smoothing
+        self.omega=omega
+        self.levels=[op]
+        self.invdiag=[1.0/op.diagonal().reshape(op.gridshape)]
+        self.prolongations=[]
+        while True:
+            fine=self.levels[-1];mesh=fine.mesh
+            if mesh.nodes<=coarsenodes or mesh.nx%2==1 or mesh.ny%2==1:
+                break
+            coarse=mesh2d(mesh.xmin,mesh.xmax,mesh.ymin,mesh.ymax,mesh.nx//2,mesh.ny//2,mesh.meshtype)
+            coarse.createmesh()
+            fixed=None
+            if fine.fixed is not None:
+                fixed=np.flatnonzero(fine.fixed[::2,::2])
+            cop=stenciloperator(coarse,coarsematrix(mesh,fine.Ke),fixed)
+            Px=prolongation1d(coarse.nx,coarse.order)[1]
+            Py=prolongation1d(coarse.ny,coarse.order)[1]
+            self.prolongations.append((Py,Px))
+            self.levels.append(cop)
+            self.invdiag.append(1.0/cop.diagonal().reshape(cop.gridshape))
+        # the coarsest grid is assembled and factorized
+        op=self.levels[-1];mesh=op.mesh
+        plan=assemblyplan(mesh)
+        K=plan.creatematrix(assembleuniform(plan,op.Ke))
+        if op.fixed is not None:
+            free=sp.diags((~op.fixed.ravel()).astype(np.float64))
+            K=free.dot(K).dot(free)+sp.diags(op.fixed.ravel().astype(np.float64))
+        self.coarsesolver=splu(K.tocsc())
+        self.shape=self.levels[0].shape
+    def prolong(self,level,Xc):
+        """
+        interpolate the grid values of level+1 to level, Xf=Py*Xc*Px^T
+        """
+        Py,Px=self.prolongations[level]
+        return Px.dot(Py.dot(Xc).T).T
+    def restrict(self,level,Xf):
+        """
+        the transpose of prolong, Xc=Py^T*Xf*Px
+        """
+        Py,Px=self.prolongations[level]
+        return Px.T.dot(Py.T.dot(Xf).T).T
+    def smooth(self,level,R,X):
+        """
+        the damped jacobi sweeps of one level, X is updated in place
+        """
+        op=self.levels[level]
+        for i in range(self.smoothing):
+            X+=self.omega*self.invdiag[level]*(R-op.matvec(X.ravel()).reshape(op.gridshape))
+        return X
+    def vcycle(self,level,R):
+        """
+        one V-cycle of the level for the residual grid R, zero initial guess
+        """
+        op=self.levels[level]
+        if level==len(self.levels)-1:
+            return self.coarsesolver.solve(R.ravel()).reshape(op.gridshape)
+        X=self.smooth(level,R,np.zeros(op.gridshape))
+        D=R-op.matvec(X.ravel()).reshape(op.gridshape)
+        if op.fixed is not None:
+            D[op.fixed]=0.0
+        Ec=self.vcycle(level+1,self.restrict(level,D))
+        E=self.prolong(level,Ec)
+        if op.fixed is not None:
+            E[op.fixed]=0.0
+        X+=E
+        return self.smooth(level,R,X)
+    def apply(self,r):
+        """
+        apply the V-cycle to the residual vector r
+        """
+        op=self.levels[0]
+        return self.vcycle(0,np.asarray(r,dtype=np.float64).reshape(op.gridshape)).ravel()
+    def aslinearoperator(self):
+        """
+        return the scipy LinearOperator, i.e. the preconditioner M of the krylov solvers
+        """
+        return LinearOperator(self.shape,matvec=self.apply,dtype=np.float64)
@@ -0,0 +1,216 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import time
+import sys
+from FEToy.fe.assembler import assemblyplan
+from FEToy.fe.geometry import geometrycache
+from FEToy.fe.shapefun import shape1d
+from FEToy.fe.gaussrule import gausspoint1d
+from FEToy.fe.linearsolver import linearsolver
+from FEToy.fe import kernels
+
+
+class lineartransient:
+    def __init__(self,mesh,shp,gpoints,D=1.0,dt=1.0e-3,bc=None,config=None,geometry=None):
+        """
+        Initialize the linear transient driver of the diffusion equation (c-cold)/dt=div(D*grad(c)) with
+        the backward euler scheme. M and Kstiff are assembled once, the system matrix M/dt+D*Kstiff is
+        factorized once and only refactorized when dt, D or the fixed dofs change, so one time step only costs the rhs
+        M*cold/dt+flux and one triangular solve
+
+        Parameters
+        ----------
+        mesh : mesh1d or mesh2d
+            the mesh class, createmesh() must be called before
+        shp : shape1d or shape2d
+            the shape function class
+        gpoints : gausspoint1d or gausspoint2d
+            the gauss points
+        D : double
+            the diffusion coefficient
+        dt : double
+            the time step size
+        bc : dirichletbc
+            the dirichlet boundary conditions, their values can be changed by bc.setvalue() between the steps,
+            new conditions added by bc.addbc() are detected and trigger a refactorization
+        config : solverconfig
+            the linear solver configuration, i.e. solverconfig('cholmod'), superlu is used if it is None
+        geometry : geometrycache
+            the geometry cache of the mesh, a new one is created if it is None
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the transient driver')
+        self.mesh=mesh
+        self.D=D
+        self.dt=dt
+        self.bc=bc
+        self.plan=assemblyplan(mesh,1)
+        self.nDofs=self.plan.nDofs
+        if geometry is None:
+            geometry=geometrycache(mesh,shp,gpoints)
+        self.geometry=geometry
+        self.solver=linearsolver(config)
+        self.flux=np.zeros(self.nDofs)
+        self.assemble()
+        self.factorized=False
+        self.factorizations=0
+        # D and the fixed dofs used by the current factorization
+        self.factorizedD=None
+        self.factorizedfixed=None
+    def assemble(self):
+        """
+        assemble the mass matrix M and the stiffness matrix Kstiff, i.e. after the mesh is changed
+        """
+        plan=self.plan
+        Mdata=np.zeros(plan.nnz);Kdata=np.zeros(plan.nnz)
+        for elements,shape_val,shape_grad,JxW in self.geometry.chunks():
+            Me=kernels.scalarbatch(shape_val,shape_grad,JxW,a=1.0,b=0.0)
+            Ke=kernels.scalarbatch(shape_val,shape_grad,JxW,a=0.0,b=1.0)
+            plan.assemblematrix(Me,elements,Mdata)
+            plan.assemblematrix(Ke,elements,Kdata)
+        self.M=plan.creatematrix(Mdata)
+        self.Kstiff=plan.creatematrix(Kdata)
+        self.factorized=False
+    def addflux(self,side,j0):
+        """
+        add the constant flux j0 on one side of the mesh to the flux vector, for 1d mesh it is a point
+        flux, for 2d mesh the flux is integrated over the line elements of mesh.bcconn[side]
+
+        Parameters
+        ----------
+        side : string
+            'left', 'right'(1d and 2d), 'bottom', 'top'(2d)
+        j0 : double
+            the flux value
+        """
+        mesh=self.mesh
+        if side not in mesh.bcnodeids:
+            sys.exit('unsupported side (%s) in lineartransient->addflux'%(side))
+        if mesh.dim==1:
+            self.flux[mesh.bcnodeids[side]]+=j0
+            return
+        shp=shape1d(meshtype='edge%d'%(mesh.order+1))
+        shp.update()
+        gpoints=gausspoint1d(ngp=mesh.order+1)
+        gpoints.creategausspoint()
+        conn=mesh.bcconn[side]
+        shape_val,shape_grad,JxW=shp.calcbatch(mesh.nodecoords,conn,gpoints)
+        Fe=j0*np.einsum('eqi,eq->ei',shape_val,JxW)
+        self.flux+=np.bincount(np.asarray(conn,dtype=np.int64).ravel(),weights=Fe.ravel(),minlength=self.nDofs)
+    def resetflux(self):
+        self.flux[:]=0.0
+    def setdt(self,dt):
+        """
+        change the time step size, the system matrix is refactorized in the next step
+        """
+        if not dt==self.dt:
+            self.dt=dt
+            self.factorized=False
+    def setD(self,D):
+        """
+        change the diffusion coefficient, the system matrix is refactorized in the next step
+        """
+        if not D==self.D:
+            self.D=D
+            self.factorized=False
+    def isstale(self):
+        """
+        check whether the factorization has to be rebuilt, i.e. dt or D are changed or new dirichlet
+        conditions are added by bc.addbc() after the last factorization
+        """
+        if not self.factorized or not self.D==self.factorizedD:
+            return True
+        if self.bc is None:
+            return False
+        return not np.array_equal(self.bc.getfixeddofs(),self.factorizedfixed)
+    def factorize(self):
+        """
+        build the system matrix M/dt+D*Kstiff, eliminate the dirichlet dofs and factorize it
+        """
+        A=(self.M/self.dt+self.D*self.Kstiff).tocsr()
+        if self.bc is None:
+            self.Kfc=None
+            self.factorizedfixed=None
+            self.solver.setup(A)
+        else:
+            free=self.bc.getfreedofs();fixed=self.bc.getfixeddofs()
+            Afree=A[free]
+            self.Kfc=Afree[:,fixed]
+            self.factorizedfixed=fixed.copy()
+            self.solver.setup(Afree[:,free])
+        self.factorizedD=self.D
+        self.factorized=True
+        self.factorizations+=1
+    def getrhs(self,cold):
+        """
+        return the rhs vector M*cold/dt+flux
+        """
+        return self.M.dot(cold)/self.dt+self.flux
+    def step(self,cold,dt=None):
+        """
+        solve one time step
+
+        Parameters
+        ----------
+        cold : array
+            the solution of the previous step
+        dt : double
+            the time step size, the current one is used if it is None
+
+        Returns
+        -------
+        c : array
+            the solution of the current step
+        info : solverinfo
+            the information of the linear solve
+        """
+        if dt is not None:
+            self.setdt(dt)
+        setuptime=0.0
+        if self.isstale():
+            start=time.perf_counter()
+            self.factorize()
+            setuptime=time.perf_counter()-start
+        F=self.getrhs(cold)
+        if self.bc is None:
+            c,info=self.solver.solve(None,F)
+        else:
+            fixed=self.bc.getfixeddofs()
+            Ff=F[self.bc.getfreedofs()]-self.Kfc.dot(self.bc.values[fixed])
+            cf,info=self.solver.solve(None,Ff)
+            c=self.bc.expand(cf)
+        info.setuptime=setuptime
+        return c,info
+    def run(self,c0,totalstep,callback=None):
+        """
+        solve totalstep time steps with the current dt
+
+        Parameters
+        ----------
+        c0 : array
+            the initial condition
+        totalstep : int
+            the number of time steps
+        callback : function
+            called as callback(step,time,c) after each step, i.e. for the output
+
+        Returns
+        -------
+        c : array
+            the solution of the last step
+        """
+        c=np.array(c0,dtype=np.float64)
+        t=0.0
+        for step in range(totalstep):
+            c,info=self.step(c)
+            t+=self.dt
+            if callback is not None:
+                callback(step+1,t,c)
+        return c
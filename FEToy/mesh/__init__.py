@@ -19,4 +19,4 @@ THE SOFTWARE.
 """
 
 
-__all__=["lagrange1dmesh","lagrange2dmesh"]
+__all__=["lagrange1dmesh","lagrange2dmesh","meshutils"]
@@ -9,6 +9,7 @@ __date__ = "Dec 19, 2021"
 import numpy as np
 import matplotlib.pyplot as plt
 import sys
+from FEToy.mesh.meshutils import indextype,greedycoloring,colorgroups,bandwidth,rcmpermutation,permutenodes
 
 class mesh1d:
     def __init__(self,xmin=0.0,xmax=1.0,nx=5,meshtype='edge2'):
@@ -33,10 +34,15 @@ class mesh1d:
         self.nx=nx
         self.order=1
         self.nodes=0
+        self.indextype=np.int32
         self.nodesperelement=2
         self.elements=0
         self.meshtype=meshtype
         self.vtkcelltype=3
+        # the mesh is a structured grid of uniform elements, set uniform=False if you move the nodes
+        self.structured=True
+        self.uniform=True
+        self.hx=(xmax-xmin)/nx
         self.setmeshtype(meshtype)
     def setnx(self,nx):
         """
@@ -92,19 +98,87 @@ class mesh1d:
         """
         self.elements=self.nx
         self.nodes=self.elements*self.order+1
+        self.indextype=indextype(self.nodes)
         dx=(self.xmax-self.xmin)/(self.nodes-1)
-        self.nodecoords=np.zeros(self.nodes)
-        for i in range(self.nodes):
-            self.nodecoords[i]=self.xmin+i*dx
+        self.hx=(self.xmax-self.xmin)/self.nx
+        self.structured=True
+        self.uniform=True
+        self.nodepermutation=None
+        # the element coloring belongs to the old elements, colorelements() must be called again
+        self.elementcolors=None
+        self.colorgroups=None
+        self.ncolors=0
+        self.nodecoords=self.xmin+np.arange(self.nodes)*dx
 
-        self.elementconn=np.zeros((self.elements,self.nodesperelement),dtype=np.int16)
-        for e in range(self.elements):
-            for j in range(self.nodesperelement):
-                self.elementconn[e,j]=e*self.order+j
+        # element e holds the nodes e*order,...,e*order+nodesperelement-1
+        self.elementconn=(self.order*np.arange(self.elements,dtype=self.indextype)[:,None]
+                         +np.arange(self.nodesperelement,dtype=self.indextype)[None,:])
 
         # for the boundary elements, in 1d case, it is just simple point
-        self.bcelements={'left':1-1,'right':self.nodes-1}
-        self.bcnodeids={'left':1-1,'right':self.nodes-1}
+        self.bcelements={'left':self.indextype(1-1),'right':self.indextype(self.nodes-1)}
+        self.bcnodeids={'left':self.indextype(1-1),'right':self.indextype(self.nodes-1)}
+    def colorelements(self):
+        """
+        color the elements so that no two elements of the same color share a node, the structured
+        1d mesh only needs 2 colors(odd and even elements), otherwise the greedy coloring is used
+
+        Returns
+        -------
+        groups : list
+            the element ids of each color
+        """
+        if not hasattr(self,'elementconn'):
+            sys.exit('please call createmesh() before you color the elements')
+        if self.structured:
+            self.elementcolors=(np.arange(self.elements)%2).astype(np.int32)
+        else:
+            self.elementcolors=greedycoloring(self.elementconn,self.nodes)
+        self.colorgroups=colorgroups(self.elementcolors)
+        self.ncolors=len(self.colorgroups)
+        return self.colorgroups
+    def renumber(self,method='rcm',verbose=True):
+        """
+        renumber the nodes to reduce the bandwidth and the profile of the global matrix, nodecoords,
+        elementconn, bcnodeids and bcconn are permuted consistently, the current numbering is kept if the
+        new one does not reduce the profile. The node grid numbering is lost, so
+        structured is set to False
+
+        Parameters
+        ----------
+        method : string
+            'rcm' for the reverse cuthill-mckee ordering
+        verbose : boolean
+            True to print the bandwidth and the profile before and after the renumbering
+
+        Returns
+        -------
+        perm : (nodes,) array
+            the new node k is the old node perm[k], so a solution of the old numbering is unew=uold[perm] and
+            a solution u of the new numbering goes back to the old one by uold[perm]=u
+        """
+        if not hasattr(self,'elementconn'):
+            sys.exit('please call createmesh() before you renumber the nodes')
+        before=bandwidth(self.elementconn,self.nodes)
+        if method=='rcm':
+            perm=rcmpermutation(self.elementconn,self.nodes)
+        else:
+            sys.exit('unsupported renumbering method (%s), please use rcm'%(method))
+        newids=np.empty(self.nodes,dtype=np.int64)
+        newids[perm]=np.arange(self.nodes)
+        if bandwidth(newids[self.elementconn],self.nodes)[1]>=before[1]:
+            perm=np.arange(self.nodes) # no gain, keep the current numbering
+        if not np.array_equal(perm,np.arange(self.nodes)):
+            permutenodes(self,perm)
+            self.structured=False
+            if getattr(self,'nodepermutation',None) is None:
+                self.nodepermutation=perm
+            else:
+                self.nodepermutation=self.nodepermutation[perm]
+        after=bandwidth(self.elementconn,self.nodes)
+        self.bandwidthinfo={'before':before,'after':after}
+        if verbose:
+            print('renumber the nodes (%s): bandwidth %d -> %d, profile %d -> %d'%(method,before[0],after[0],before[1],after[1]))
+        return perm
     #####################################################
     def printnodes(self):
         """
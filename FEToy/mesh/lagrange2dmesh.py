@@ -9,6 +9,7 @@ __date__ = "Dec 19, 2021"
 import numpy as np
 import matplotlib.pyplot as plt
 import sys
+from FEToy.mesh.meshutils import indextype,greedycoloring,colorgroups,bandwidth,rcmpermutation,permutenodes
 
 class mesh2d:
     def __init__(self,xmin=0.0,xmax=1.0,ymin=0.0,ymax=1.0,nx=5,ny=5,meshtype='quad4'):
@@ -42,10 +43,16 @@ class mesh2d:
         self.ny=ny
         self.order=1
         self.nodes=0
+        self.indextype=np.int32
         self.nodesperelement=4
         self.elements=0
         self.meshtype=meshtype
         self.vtkcelltype=9
+        # the mesh is a structured grid of uniform hx*hy rectangles, set uniform=False if you move the nodes
+        self.structured=True
+        self.uniform=True
+        self.hx=(xmax-xmin)/nx
+        self.hy=(ymax-ymin)/ny
         self.setmeshtype(meshtype)
     def setnx(self,nx):
         """
@@ -111,161 +118,155 @@ class mesh2d:
         self.createmesh()
     def createmesh(self):
         """
-        generate the lagrange mesh in 2d case
+        generate the lagrange mesh in 2d case, the nodes are numbered row by row(from bottom to top)
         """
-        if 'quad4' in self.meshtype:
-            self.elements=self.nx*self.ny
-            self.nodes=(self.nx+1)*(self.ny+1)
-            dx=(self.xmax-self.xmin)/(self.nx)
-            dy=(self.ymax-self.ymin)/(self.ny)
-            self.nodecoords=np.zeros((self.nodes,2))
+        p=self.order # the node spacing of one element in the index space
+        self.elements=self.nx*self.ny
+        self.nodes=(p*self.nx+1)*(p*self.ny+1)
+        self.indextype=indextype(self.nodes)
+        dx=(self.xmax-self.xmin)/(p*self.nx)
+        dy=(self.ymax-self.ymin)/(p*self.ny)
+        self.hx=(self.xmax-self.xmin)/self.nx
+        self.hy=(self.ymax-self.ymin)/self.ny
+        self.structured=True
+        self.uniform=True
+        self.nodepermutation=None
+        # the element coloring belongs to the old elements, colorelements() must be called again
+        self.elementcolors=None
+        self.colorgroups=None
+        self.ncolors=0
+
+        # node k=j*(p*nx+1)+i is located at (xmin+i*dx,ymin+j*dy)
+        i,j=np.meshgrid(np.arange(p*self.nx+1),np.arange(p*self.ny+1))
+        self.nodecoords=np.zeros((self.nodes,2))
+        self.nodecoords[:,0]=self.xmin+i.ravel()*dx
+        self.nodecoords[:,1]=self.ymin+j.ravel()*dy
+        nodeids=np.arange(self.nodes,dtype=self.indextype).reshape((p*self.ny+1,p*self.nx+1))
 
-            # for bc nodes
-            leftnodes=np.zeros(self.ny+1,dtype=np.int16)
-            rightnodes=np.zeros(self.ny+1,dtype=np.int16)
-            bottomnodes=np.zeros(self.nx+1,dtype=np.int16)
-            topnodes=np.zeros(self.nx+1,dtype=np.int16)
-            for j in range(self.ny+1):
-                for i in range(self.nx+1):
-                    k=j*(self.nx+1)+i
-                    self.nodecoords[k,0]=self.xmin+i*dx
-                    self.nodecoords[k,1]=self.ymin+j*dx
-                    if i==0:
-                        # for left nodes
-                        leftnodes[j]=k
-                    if i==self.nx:
-                        # for right nodes
-                        rightnodes[j]=k
-                    if j==0:
-                        # for bottom nodes
-                        bottomnodes[i]=k
-                    if j==self.ny:
-                        # for top nodes
-                        topnodes[i]=k
-            self.bcnodeids={'left':leftnodes,'right':rightnodes,'bottom':bottomnodes,'top':topnodes}
-            ###########################################
-            self.elementconn=np.zeros((self.elements,self.nodesperelement),dtype=np.int16)
-            # for bc elements
-            leftconn=np.zeros((self.ny,2),dtype=np.int16)
-            rightconn=np.zeros((self.ny,2),dtype=np.int16)
-            bottomconn=np.zeros((self.nx,2),dtype=np.int16)
-            topconn=np.zeros((self.nx,2),dtype=np.int16)
-            for j in range(1,self.ny+1):
-                for i in range(1,self.nx+1):
-                    e=(j-1)*self.nx+i-1
-                    i1=(j-1)*(self.nx+1)+i
-                    i2=i1+1
-                    i3=i2+self.nx+1
-                    i4=i3-1
-                    self.elementconn[e,0]=i1-1
-                    self.elementconn[e,1]=i2-1
-                    self.elementconn[e,2]=i3-1
-                    self.elementconn[e,3]=i4-1
-                    # 4 +-----+ 3
-                    #   |     |
-                    #   |     |
-                    # 1 +-----+ 2
-                    if i==1:
-                        # for left side
-                        leftconn[j-1,0]=i4-1
-                        leftconn[j-1,1]=i1-1
-                    if i==self.nx:  
-                        # for right side
-                        rightconn[j-1,0]=i2-1
-                        rightconn[j-1,1]=i3-1
-                    if j==1:  
-                        # for bottom side
-                        bottomconn[i-1,0]=i1-1
-                        bottomconn[i-1,1]=i2-1
-                    if j==self.ny:
-                        # for top side
-                        topconn[i-1,0]=i3-1
-                        topconn[i-1,1]=i4-1
-            self.bcconn={'left':leftconn,'right':rightconn,'bottom':bottomconn,'top':topconn}
+        # for bc nodes
+        leftnodes  =np.ascontiguousarray(nodeids[:, 0])
+        rightnodes =np.ascontiguousarray(nodeids[:,-1])
+        bottomnodes=np.ascontiguousarray(nodeids[ 0,:])
+        topnodes   =np.ascontiguousarray(nodeids[-1,:])
+        self.bcnodeids={'left':leftnodes,'right':rightnodes,'bottom':bottomnodes,'top':topnodes}
+        ###########################################
+        if 'quad4' in self.meshtype:
+            # 4 +-----+ 3
+            #   |     |
+            #   |     |
+            # 1 +-----+ 2
+            localnodes=[(0,0),(1,0),(1,1),(0,1)]
         elif 'quad9' in self.meshtype:
-            self.elements=self.nx*self.ny
-            self.nodes=(2*self.nx+1)*(2*self.ny+1)
-            dx=(self.xmax-self.xmin)/(2*self.nx)
-            dy=(self.ymax-self.ymin)/(2*self.ny)
-            self.nodecoords=np.zeros((self.nodes,2))
-            # for bc nodes
-            leftnodes=np.zeros(2*self.ny+1,dtype=np.int16)
-            rightnodes=np.zeros(2*self.ny+1,dtype=np.int16)
-            bottomnodes=np.zeros(2*self.nx+1,dtype=np.int16)
-            topnodes=np.zeros(2*self.nx+1,dtype=np.int16)
-            for j in range(2*self.ny+1):
-                for i in range(2*self.nx+1):
-                    k=j*(2*self.nx+1)+i
-                    self.nodecoords[k,0]=self.xmin+i*dx
-                    self.nodecoords[k,1]=self.ymin+j*dy
-                    if i==0:
-                        # for left nodes
-                        leftnodes[j]=k
-                    if i==2*self.nx:
-                        # for right nodes
-                        rightnodes[j]=k
-                    if j==0:
-                        # for bottom nodes
-                        bottomnodes[i]=k
-                    if j==2*self.ny:
-                        # for top nodes
-                        topnodes[i]=k
-            self.bcnodeids={'left':leftnodes,'right':rightnodes,'bottom':bottomnodes,'top':topnodes}
-            #######################################        
-            self.elementconn=np.zeros((self.elements,self.nodesperelement),dtype=np.int16)
-            # for bc elements
-            leftconn=np.zeros((self.ny,3),dtype=np.int16)
-            rightconn=np.zeros((self.ny,3),dtype=np.int16)
-            bottomconn=np.zeros((self.nx,3),dtype=np.int16)
-            topconn=np.zeros((self.nx,3),dtype=np.int16)
-            for j in range(1,self.ny+1):
-                for i in range(1,self.nx+1):
-                    e=(j-1)*self.nx+i-1
-                    i1=(j-1)*2*(2*self.nx+1)+2*i-1
-                    i2=i1+2
-                    i3=i2+2*(2*self.nx+1)
-                    i4=i3-2
-                    i5=i1+1
-                    i6=i2+(2*self.nx+1)
-                    i7=i3-1
-                    i8=i1+(2*self.nx+1)
-                    i9=i8+1
-                    self.elementconn[e,1-1]=i1-1
-                    self.elementconn[e,2-1]=i2-1
-                    self.elementconn[e,3-1]=i3-1
-                    self.elementconn[e,4-1]=i4-1
-                    self.elementconn[e,5-1]=i5-1
-                    self.elementconn[e,6-1]=i6-1
-                    self.elementconn[e,7-1]=i7-1
-                    self.elementconn[e,8-1]=i8-1
-                    self.elementconn[e,9-1]=i9-1
-                    ##
-                    # 4 +---7---+ 3
-                    #   |       |
-                    # 8 +   9   + 6
-                    #   |       |
-                    # 1 +---5---+ 2
-                    if i==1:
-                        # for left side
-                        leftconn[j-1,0]=i4-1
-                        leftconn[j-1,1]=i8-1
-                        leftconn[j-1,2]=i1-1
-                    if i==self.nx:
-                        # for right side
-                        rightconn[j-1,0]=i2-1
-                        rightconn[j-1,1]=i6-1
-                        rightconn[j-1,2]=i3-1
-                    if j==1:
-                        # for bottom side
-                        bottomconn[i-1,0]=i1-1
-                        bottomconn[i-1,1]=i5-1
-                        bottomconn[i-1,2]=i2-1
-                    if j==self.ny:
-                        # for top side
-                        topconn[i-1,0]=i3-1
-                        topconn[i-1,1]=i7-1
-                        topconn[i-1,2]=i4-1
-            self.bcconn={'left':leftconn,'right':rightconn,'bottom':bottomconn,'top':topconn}
+            # 4 +---7---+ 3
+            #   |       |
+            # 8 +   9   + 6
+            #   |       |
+            # 1 +---5---+ 2
+            localnodes=[(0,0),(2,0),(2,2),(0,2),(1,0),(2,1),(1,2),(0,1),(1,1)]
+        # the local node (a,b) of element e=j*nx+i is the node nodeids[p*j+b,p*i+a]
+        self.localnodes=localnodes
+        self.elementconn=np.zeros((self.elements,self.nodesperelement),dtype=self.indextype)
+        for k,(a,b) in enumerate(localnodes):
+            self.elementconn[:,k]=nodeids[b:b+p*self.ny:p,a:a+p*self.nx:p].ravel()
+        # for bc elements, the left and top sides are ordered counter-clockwise as well
+        leftconn  =self.sideconn(leftnodes,self.ny,reverse=True)
+        rightconn =self.sideconn(rightnodes,self.ny)
+        bottomconn=self.sideconn(bottomnodes,self.nx)
+        topconn   =self.sideconn(topnodes,self.nx,reverse=True)
+        self.bcconn={'left':leftconn,'right':rightconn,'bottom':bottomconn,'top':topconn}
+    def sideconn(self,sidenodes,n,reverse=False):
+        """
+        generate the connectivity of the line elements on one side of the mesh
+
+        Parameters
+        ----------
+        sidenodes : array
+            the node ids along the side
+        n : int
+            the number of elements along the side
+        reverse : boolean
+            True to reverse the node order of each line element
+        """
+        p=self.order
+        ind=p*np.arange(n)[:,None]+np.arange(p+1)[None,:]
+        if reverse:
+            ind=ind[:,::-1]
+        return sidenodes[ind]
+    def colorelements(self):
+        """
+        color the elements so that no two elements of the same color share a node, i.e. for the
+        race-free threaded assembly. The structured mesh uses the 4-color checkerboard, otherwise
+        the greedy coloring is used
+
+        Returns
+        -------
+        groups : list
+            the element ids of each color
+        """
+        if not hasattr(self,'elementconn'):
+            sys.exit('please call createmesh() before you color the elements')
+        if self.structured:
+            i=np.arange(self.elements)%self.nx
+            j=np.arange(self.elements)//self.nx
+            self.elementcolors=((i%2)+2*(j%2)).astype(np.int32)
+        else:
+            self.elementcolors=greedycoloring(self.elementconn,self.nodes)
+        self.colorgroups=colorgroups(self.elementcolors)
+        self.ncolors=len(self.colorgroups)
+        return self.colorgroups
+    def renumber(self,method='rcm',verbose=True):
+        """
+        renumber the nodes to reduce the bandwidth and the profile of the global matrix, nodecoords,
+        elementconn, bcnodeids and bcconn are permuted consistently, the current numbering is kept if the
+        new one does not reduce the profile. The node grid numbering is lost, so
+        structured is set to False(the stencil operator and the checkerboard coloring are not used anymore)
+
+        Parameters
+        ----------
+        method : string
+            'rcm' for the reverse cuthill-mckee ordering, 'orientation' for the structured mesh, the
+            nodes are numbered along the shorter side first(row by row or column by column)
+        verbose : boolean
+            True to print the bandwidth and the profile before and after the renumbering
+
+        Returns
+        -------
+        perm : (nodes,) array
+            the new node k is the old node perm[k], so a solution of the old numbering is unew=uold[perm] and
+            a solution u of the new numbering goes back to the old one by uold[perm]=u
+        """
+        if not hasattr(self,'elementconn'):
+            sys.exit('please call createmesh() before you renumber the nodes')
+        before=bandwidth(self.elementconn,self.nodes)
+        if method=='rcm':
+            perm=rcmpermutation(self.elementconn,self.nodes)
+        elif method=='orientation':
+            if not self.structured:
+                sys.exit('the orientation numbering only works for the structured mesh, please use rcm')
+            p=self.order
+            nodeids=np.arange(self.nodes).reshape((p*self.ny+1,p*self.nx+1))
+            if self.nx>self.ny:
+                perm=nodeids.T.ravel() # column by column
+            else:
+                perm=nodeids.ravel()
+        else:
+            sys.exit('unsupported renumbering method (%s), please use rcm or orientation'%(method))
+        newids=np.empty(self.nodes,dtype=np.int64)
+        newids[perm]=np.arange(self.nodes)
+        if bandwidth(newids[self.elementconn],self.nodes)[1]>=before[1]:
+            perm=np.arange(self.nodes) # no gain, keep the current numbering
+        if not np.array_equal(perm,np.arange(self.nodes)):
+            permutenodes(self,perm)
+            self.structured=False
+            if getattr(self,'nodepermutation',None) is None:
+                self.nodepermutation=perm
+            else:
+                self.nodepermutation=self.nodepermutation[perm]
+        after=bandwidth(self.elementconn,self.nodes)
+        self.bandwidthinfo={'before':before,'after':after}
+        if verbose:
+            print('renumber the nodes (%s): bandwidth %d -> %d, profile %d -> %d'%(method,before[0],after[0],before[1],after[1]))
+        return perm
     #####################################################
     def printnodes(self):
         """
@@ -0,0 +1,161 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+import sys
+
+
+def indextype(n):
+    """
+    return the integer type for node/element indices, int32 is used unless the indices go beyond 2^31
+
+    Parameters
+    ----------
+    n : int
+        the largest index(or the total number of nodes) one want to store
+    """
+    if n<np.iinfo(np.int32).max:
+        return np.int32
+    return np.int64
+
+def greedycoloring(elementconn,nodes):
+    """
+    color the elements greedily so that no two elements of the same color share a node,
+    each element takes the smallest color not used by the elements around its nodes
+
+    Parameters
+    ----------
+    elementconn : (nElem,nNodes) array
+        the element connectivity
+    nodes : int
+        the number of nodes of the mesh
+
+    Returns
+    -------
+    colors : (nElem,) array
+        the color of each element, starting from 0
+    """
+    conn=np.asarray(elementconn)
+    if conn.ndim==1:
+        conn=conn.reshape((-1,1))
+    usedcolors=[0]*nodes # bit k of usedcolors[i] is set if color k touches node i
+    colors=np.zeros(conn.shape[0],dtype=np.int32)
+    for e,elconn in enumerate(conn.tolist()):
+        used=0
+        for i in elconn:
+            used|=usedcolors[i]
+        color=((~used)&(used+1)).bit_length()-1 # the lowest zero bit
+        for i in elconn:
+            usedcolors[i]|=1<<color
+        colors[e]=color
+    return colors
+
+def colorgroups(colors):
+    """
+    return the element ids of each color, [ids of color 0, ids of color 1, ...]
+    """
+    order=np.argsort(colors,kind='stable')
+    counts=np.bincount(colors)
+    return np.split(order,np.cumsum(counts)[:-1])
+
+def checkcoloring(elementconn,colors):
+    """
+    return True if no two elements of the same color share a node
+    """
+    conn=np.asarray(elementconn,dtype=np.int64)
+    for group in colorgroups(np.asarray(colors)):
+        nodeids=conn[group].ravel()
+        if not np.unique(nodeids).size==nodeids.size:
+            return False
+    return True
+
+def validcoloring(mesh):
+    """
+    return True if the element coloring stored on the mesh covers the current elements of the mesh
+    """
+    groups=getattr(mesh,'colorgroups',None)
+    if groups is None:
+        return False
+    return sum(len(group) for group in groups)==mesh.elements
+
+def nodegraph(elementconn,nodes):
+    """
+    return the node adjacency graph of the mesh as a symmetric csr_matrix, two nodes are connected
+    if they belong to the same element(the sparsity pattern of the global matrix)
+    """
+    conn=np.asarray(elementconn,dtype=np.int64)
+    if conn.ndim==1:
+        conn=conn.reshape((-1,1))
+    nNodes=conn.shape[1]
+    rows=np.repeat(conn,nNodes,axis=1).ravel()
+    cols=np.tile(conn,(1,nNodes)).ravel()
+    graph=sp.csr_matrix((np.ones(rows.size,dtype=np.int8),(rows,cols)),shape=(nodes,nodes))
+    graph.sum_duplicates()
+    return graph
+
+def bandwidth(elementconn,nodes):
+    """
+    calculate the bandwidth and the profile of the global matrix of the mesh
+
+    Returns
+    -------
+    bandwidth : int
+        max|i-j| of all the nonzero entries
+    profile : int
+        the sum of i-min(j) over all the rows, the number of entries in the lower envelope
+    """
+    graph=nodegraph(elementconn,nodes).tocoo()
+    if graph.nnz==0:
+        return 0,0
+    band=int(np.max(np.abs(graph.row-graph.col)))
+    firstcol=np.full(nodes,nodes,dtype=np.int64)
+    np.minimum.at(firstcol,graph.row,graph.col)
+    rows=np.arange(nodes)
+    profile=int(np.sum(np.where(firstcol<=rows,rows-firstcol,0)))
+    return band,profile
+
+def rcmpermutation(elementconn,nodes):
+    """
+    calculate the reverse cuthill-mckee ordering of the nodes
+
+    Returns
+    -------
+    perm : (nodes,) array
+        the new node k is the old node perm[k]
+    """
+    return reverse_cuthill_mckee(nodegraph(elementconn,nodes),symmetric_mode=True).astype(np.int64)
+
+def permutenodes(mesh,perm):
+    """
+    renumber the nodes of the mesh in place, the new node k is the old node perm[k], nodecoords,
+    elementconn, bcnodeids and bcconn(and bcelements of the 1d mesh) are permuted consistently
+
+    Returns
+    -------
+    newids : (nodes,) array
+        the new id of each old node, a solution of the old numbering is unew[newids]=uold
+    """
+    perm=np.asarray(perm,dtype=np.int64)
+    if not np.array_equal(np.sort(perm),np.arange(mesh.nodes)):
+        sys.exit('the node permutation is not valid')
+    newids=np.empty(mesh.nodes,dtype=np.int64)
+    newids[perm]=np.arange(mesh.nodes)
+    mesh.nodecoords=np.ascontiguousarray(mesh.nodecoords[perm])
+    mesh.elementconn=newids[mesh.elementconn].astype(mesh.indextype)
+    def renumberids(ids):
+        if np.ndim(ids)==0:
+            return mesh.indextype(newids[int(ids)])
+        return newids[np.asarray(ids)].astype(mesh.indextype)
+    mesh.bcnodeids={side:renumberids(ids) for side,ids in mesh.bcnodeids.items()}
+    if hasattr(mesh,'bcconn'):
+        mesh.bcconn={side:renumberids(conn) for side,conn in mesh.bcconn.items()}
+    if hasattr(mesh,'bcelements'):
+        mesh.bcelements={side:renumberids(ids) for side,ids in mesh.bcelements.items()}
+    return newids
@@ -0,0 +1,106 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+
+import numpy as np
+import threading
+import queue
+import atexit
+import sys
+
+from FEToy.postprocess.Result import ResultIO
+
+class AsyncResultIO:
+    def __init__(self,writer=None,prefixname='',maxqueue=2):
+        """
+        Initialize the asynchronous output class, the solution is copied when an output is requested
+        and the formatting and the disk write are done by one background thread, so the solver
+        only waits when maxqueue outputs are still pending
+
+        Parameters
+        ----------
+        writer : ResultIO or ResultSeries
+            the writer used in the background, a new ResultIO(prefixname) is created if it is None
+        prefixname : string
+            the name of the output file(only prefix)
+        maxqueue : int
+            the maximum number of pending outputs
+        """
+        if writer is None:
+            writer=ResultIO(prefixname)
+        self.writer=writer
+        self.queue=queue.Queue(maxsize=maxqueue)
+        self.errors=[]
+        self.thread=threading.Thread(target=self.run,daemon=True)
+        self.thread.start()
+        # the pending outputs are still written if the script ends without close()
+        atexit.register(self.close)
+    def run(self):
+        """
+        the loop of the background thread
+        """
+        while True:
+            task=self.queue.get()
+            if task is None:
+                self.queue.task_done()
+                break
+            method,args,kwargs=task
+            try:
+                getattr(self.writer,method)(*args,**kwargs)
+            except BaseException as e:
+                self.errors.append('%s: %s'%(method,e))
+            self.queue.task_done()
+    def submit(self,method,*args,**kwargs):
+        """
+        put one output task into the queue, it blocks while the queue is full
+        """
+        self.checkerrors()
+        if not self.thread.is_alive():
+            sys.exit('the background writer of AsyncResultIO is already closed!')
+        self.queue.put((method,args,kwargs))
+    def save2csv(self,mesh,solution,varnamelist,step,**kwargs):
+        """
+        Save results to csv file in the background, see ResultIO.save2csv
+        """
+        self.submit('save2csv',mesh,np.array(solution,copy=True),list(varnamelist),step,**kwargs)
+    def save2vtu(self,mesh,solution,varnamelist,step,**kwargs):
+        """
+        Save results to vtu file in the background, see ResultIO.save2vtu
+        """
+        self.submit('save2vtu',mesh,np.array(solution,copy=True),list(varnamelist),step,**kwargs)
+    def save(self,solution,step,time):
+        """
+        Save one step of the time series in the background, see ResultSeries.save
+        """
+        self.submit('save',np.array(solution,copy=True),step,time)
+    def checkerrors(self):
+        """
+        stop the program if one of the background outputs failed
+        """
+        if len(self.errors)>0:
+            sys.exit('background output failed, '+'; '.join(self.errors))
+    def flush(self):
+        """
+        wait until all the pending outputs are written
+        """
+        self.queue.join()
+        self.checkerrors()
+    def close(self):
+        """
+        write all the pending outputs and stop the background thread
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        atexit.unregister(self.close)
+        self.checkerrors()
+    def __enter__(self):
+        return self
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+        return False
@@ -0,0 +1,207 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+
+import numpy as np
+import zipfile
+import os
+import sys
+try:
+    import h5py
+except ImportError:
+    h5py=None
+
+from FEToy.mesh.lagrange1dmesh import mesh1d
+from FEToy.mesh.lagrange2dmesh import mesh2d
+
+class Checkpoint:
+    def __init__(self,filename='checkpoint.npz'):
+        """
+        Initialize the checkpoint class, it saves the mesh and the solution state to one binary file,
+        so a simulation can be restarted without the mesh generation
+
+        Parameters
+        ----------
+        filename : string
+            the name of the checkpoint file, '.npz' for the numpy container,
+            '.h5' or '.hdf5' for HDF5(h5py is required)
+        """
+        self.filename=filename
+        self.meshparams=['meshtype','dim','nodes','elements','nodesperelement','order','vtkcelltype',
+                         'xmin','xmax','nx','ymin','ymax','ny','hx','hy','structured','uniform',
+                         'localnodes','nodepermutation']
+    def ishdf5(self):
+        return self.filename.endswith('.h5') or self.filename.endswith('.hdf5')
+    def save(self,mesh,solution,solutionold,step,dt,time=0.0):
+        """
+        save the mesh and the solution state
+
+        Parameters
+        ----------
+        mesh : mesh class
+            the mesh1d or mesh2d class
+        solution : numpy array
+            the solution of the current step
+        solutionold : numpy array
+            the solution of the previous step
+        step : int
+            the current time step
+        dt : double
+            the current time step size
+        time : double
+            the current physical time
+        """
+        arrays={'nodecoords':mesh.nodecoords,'elementconn':mesh.elementconn,
+                'solution':np.asarray(solution),'solutionold':np.asarray(solutionold),
+                'step':np.array(step),'dt':np.array(dt),'time':np.array(time),
+                'meshclass':np.array(type(mesh).__name__)}
+        for name in self.meshparams:
+            if getattr(mesh,name,None) is not None:
+                arrays['mesh/'+name]=np.array(getattr(mesh,name))
+        for side in mesh.bcnodeids:
+            arrays['bcnodeids/'+side]=np.asarray(mesh.bcnodeids[side])
+        if hasattr(mesh,'bcconn'):
+            for side in mesh.bcconn:
+                arrays['bcconn/'+side]=np.asarray(mesh.bcconn[side])
+
+        # write to a temporary file first, so a crash during the output keeps the previous checkpoint
+        tmpname=self.filename+'.tmp'
+        if self.ishdf5():
+            if h5py is None:
+                sys.exit('h5py is not installed, please use the .npz checkpoint file')
+            f=h5py.File(tmpname,'w')
+            for name in arrays:
+                data=arrays[name]
+                if data.dtype.kind=='U':
+                    f.create_dataset(name,data=str(data))
+                elif data.ndim>0 and data.size>0:
+                    f.create_dataset(name,data=data,chunks=True)
+                else:
+                    f.create_dataset(name,data=data)
+            f.close()
+        else:
+            f=open(tmpname,'wb')
+            np.savez(f,**arrays)
+            f.close()
+        os.replace(tmpname,self.filename)
+        print('write checkpoint to %s (step=%d)'%(self.filename,step))
+    def load(self,mmap=True):
+        """
+        load the checkpoint file
+
+        Parameters
+        ----------
+        mmap : boolean
+            True to memory map the mesh arrays of the .npz file(read only), otherwise they are read into memory.
+            The solution vectors are always returned as writable copies
+
+        Returns
+        -------
+        mesh : mesh class
+            the restored mesh1d or mesh2d class
+        state : dict
+            solution, solutionold, step, dt and time
+        """
+        if self.ishdf5():
+            if h5py is None:
+                sys.exit('h5py is not installed, can not read %s'%(self.filename))
+            arrays={}
+            f=h5py.File(self.filename,'r')
+            def visit(name,obj):
+                if isinstance(obj,h5py.Dataset):
+                    value=obj[()]
+                    if isinstance(value,bytes):
+                        value=value.decode()
+                    arrays[name]=np.array(value)
+            f.visititems(visit)
+            f.close()
+        elif mmap:
+            arrays=self.mmapnpz(self.filename)
+        else:
+            f=np.load(self.filename)
+            arrays={name:f[name] for name in f.files}
+            f.close()
+
+        mesh=self.restoremesh(arrays)
+        # the solver updates the solution in place, so it must not be the read only memory map
+        state={'solution':np.array(arrays['solution']),'solutionold':np.array(arrays['solutionold']),
+               'step':int(arrays['step']),'dt':float(arrays['dt']),'time':float(arrays['time'])}
+        print('read checkpoint from %s (step=%d)'%(self.filename,state['step']))
+        return mesh,state
+    def restoremesh(self,arrays):
+        """
+        restore the mesh class from the checkpoint arrays, createmesh() is not called
+        """
+        meshclass=str(arrays['meshclass'])
+        meshtype=str(arrays['mesh/meshtype'])
+        if meshclass=='mesh1d':
+            mesh=mesh1d(meshtype=meshtype)
+        elif meshclass=='mesh2d':
+            mesh=mesh2d(meshtype=meshtype)
+        else:
+            sys.exit('unsupported mesh class(%s) in the checkpoint file'%(meshclass))
+        for name in self.meshparams:
+            key='mesh/'+name
+            if key in arrays:
+                value=arrays[key][()]
+                if isinstance(value,np.generic):
+                    value=value.item()
+                setattr(mesh,name,value)
+        mesh.meshtype=meshtype
+        # the local node grid offsets are a list of (a,b), the permutation is None if the nodes are not renumbered
+        if hasattr(mesh,'localnodes'):
+            mesh.localnodes=[(int(a),int(b)) for a,b in mesh.localnodes]
+        mesh.nodepermutation=arrays['mesh/nodepermutation'] if 'mesh/nodepermutation' in arrays else None
+        mesh.nodecoords=arrays['nodecoords']
+        mesh.elementconn=arrays['elementconn']
+        mesh.indextype=mesh.elementconn.dtype.type
+        mesh.bcnodeids={}
+        mesh.bcconn={}
+        for name in arrays:
+            if name.startswith('bcnodeids/'):
+                mesh.bcnodeids[name.split('/')[1]]=arrays[name]
+            elif name.startswith('bcconn/'):
+                mesh.bcconn[name.split('/')[1]]=arrays[name]
+        if meshclass=='mesh1d':
+            mesh.bcelements=mesh.bcnodeids
+        return mesh
+    def mmapnpz(self,filename):
+        """
+        memory map the arrays of an uncompressed .npz file(as written by np.savez)
+
+        Parameters
+        ----------
+        filename : string
+            the name of the .npz file
+        """
+        arrays={}
+        archive=zipfile.ZipFile(filename,'r')
+        f=open(filename,'rb')
+        for info in archive.infolist():
+            name=info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if not info.compress_type==zipfile.ZIP_STORED:
+                arrays[name]=np.load(archive.open(info))
+                continue
+            # the data starts after the 30 bytes local file header, the file name and the extra field
+            f.seek(info.header_offset+26)
+            namelen=int.from_bytes(f.read(2),'little')
+            extralen=int.from_bytes(f.read(2),'little')
+            f.seek(info.header_offset+30+namelen+extralen)
+            version=np.lib.format.read_magic(f)
+            if version==(1,0):
+                shape,fortran,dtype=np.lib.format.read_array_header_1_0(f)
+            else:
+                shape,fortran,dtype=np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject or len(shape)==0 or np.prod(shape)==0:
+                arrays[name]=np.load(archive.open(info))
+            else:
+                arrays[name]=np.memmap(filename,dtype=dtype,mode='r',offset=f.tell(),shape=shape,
+                                       order='F' if fortran else 'C')
+        f.close()
+        archive.close()
+        return arrays
@@ -0,0 +1,177 @@
+__author__="Yang Bai"
+__copyright__= "Copyright (C) 2021-present by M3 Group"
+__version__ = "1.0"
+__maintainer__ = "Yang Bai"
+__email__ = "yangbai90@outlook.com"
+__status__ = "development"
+__date__ = "Oct 18, 2026"
+
+import numpy as np
+import scipy.sparse.linalg as spla
+import sys
+from FEToy.fe.assembler import assemblyplan
+from FEToy.fe.geometry import geometrycache
+from FEToy.fe.elasticity import elasticitymatrix,bmatrix
+from FEToy.fe import kernels
+
+
+class Recovery:
+    def __init__(self,mesh,shp,gpoints,E=1.0e9,nu=0.3,mode='planestress',geometry=None):
+        """
+        Initialize the stress/strain recovery of the 2d linear elasticity, the gauss point quantities
+        of all the elements are calculated at once, then they are moved to the nodes by nodal averaging
+        or L2 projection
+
+        Parameters
+        ----------
+        mesh : mesh2d
+            the mesh class, createmesh() must be called before
+        shp : shape2d
+            the shape function class
+        gpoints : gausspoint2d
+            the gauss points
+        E : double
+            the youngs modulus
+        nu : double
+            the poisson ratio
+        mode : string
+            'planestress' or 'planestrain'
+        geometry : geometrycache
+            the geometry cache of the mesh, a new one is created if it is None
+        """
+        if not hasattr(mesh,'elementconn'):
+            sys.exit('please call createmesh() before you create the recovery')
+        self.mesh=mesh
+        self.E=E
+        self.nu=nu
+        self.mode=mode
+        self.D=elasticitymatrix(E,nu,mode)
+        if geometry is None:
+            geometry=geometrycache(mesh,shp,gpoints)
+        self.geometry=geometry
+        self.conn=np.asarray(mesh.elementconn,dtype=np.int64)
+        self.nodecount=np.bincount(self.conn.ravel(),minlength=mesh.nodes).astype(np.float64)
+        self.plan=None
+        self.massfactor=None
+        self.varnamelist=['exx','eyy','exy','sxx','syy','sxy','vonMises']
+    def gpstrain(self,disp):
+        """
+        calculate the strain on all the gauss points
+
+        Parameters
+        ----------
+        disp : array
+            the displacement vector, ux and uy of node i are disp[2*i] and disp[2*i+1]
+
+        Returns
+        -------
+        strain : (nElem,nqp,3) array
+            [exx,eyy,2exy] of the voigt notation
+        """
+        disp=np.asarray(disp,dtype=np.float64)
+        if not disp.size==2*self.mesh.nodes:
+            sys.exit('the displacement vector does not match with the mesh in Recovery')
+        eldisp=disp.reshape((-1,2))[self.conn].reshape((self.mesh.elements,-1)) # (nElem,2*nNodes)
+        strain=np.zeros((self.mesh.elements,self.geometry.nqp,3))
+        for elements,shape_val,shape_grad,JxW in self.geometry.chunks():
+            strain[elements]=np.einsum('eqai,ei->eqa',bmatrix(shape_grad),eldisp[elements],optimize=True)
+        return strain
+    def gpstress(self,strain):
+        """
+        calculate the stress [sxx,syy,sxy] from the gauss point strain, (nElem,nqp,3)
+        """
+        return np.einsum('ab,eqb->eqa',self.D,strain)
+    def vonmises(self,stress):
+        """
+        calculate the von mises stress sqrt(1.5*s:s), s is the deviatoric part of the 3d stress,
+        szz=0 for plane stress and szz=nu*(sxx+syy) for plane strain
+        """
+        sxx=stress[...,0];syy=stress[...,1];sxy=stress[...,2]
+        if self.mode=='planestrain':
+            szz=self.nu*(sxx+syy)
+        else:
+            szz=np.zeros_like(sxx)
+        return np.sqrt(0.5*((sxx-syy)**2+(syy-szz)**2+(szz-sxx)**2)+3.0*sxy**2)
+    def nodalaverage(self,gpvalues):
+        """
+        move the gauss point values to the nodes: the values are averaged in each element,
+        then each node takes the mean of its surrounding elements
+
+        Parameters
+        ----------
+        gpvalues : (nElem,nqp) or (nElem,nqp,ncomp) array
+
+        Returns
+        -------
+        nodal : (nodes,) or (nodes,ncomp) array
+        """
+        elvalues=np.mean(gpvalues,axis=1)
+        if elvalues.ndim==1:
+            return self.scatter(elvalues)
+        return np.stack([self.scatter(elvalues[:,k]) for k in range(elvalues.shape[1])],axis=1)
+    def scatter(self,elvalues):
+        nNodes=self.conn.shape[1]
+        weights=np.repeat(elvalues,nNodes)
+        return np.bincount(self.conn.ravel(),weights=weights,minlength=self.mesh.nodes)/self.nodecount
+    def l2projection(self,gpvalues):
+        """
+        move the gauss point values to the nodes by the L2 projection M*v=int(N*value), the consistent
+        mass matrix is factorized once and reused
+
+        Parameters
+        ----------
+        gpvalues : (nElem,nqp) or (nElem,nqp,ncomp) array
+
+        Returns
+        -------
+        nodal : (nodes,) or (nodes,ncomp) array
+        """
+        if self.massfactor is None:
+            self.plan=assemblyplan(self.mesh,1)
+            data=np.zeros(self.plan.nnz)
+            for elements,shape_val,shape_grad,JxW in self.geometry.chunks():
+                Me=kernels.scalarbatch(shape_val,shape_grad,JxW,a=1.0,b=0.0)
+                self.plan.assemblematrix(Me,elements,data)
+            self.massfactor=spla.splu(self.plan.creatematrix(data).tocsc())
+        values=np.asarray(gpvalues,dtype=np.float64)
+        scalar=(values.ndim==2)
+        if scalar:
+            values=values[:,:,None]
+        rhs=np.zeros((self.mesh.nodes,values.shape[2]))
+        for elements,shape_val,shape_grad,JxW in self.geometry.chunks():
+            Fe=np.einsum('eqi,eqc,eq->eic',shape_val,values[elements],JxW,optimize=True)
+            for k in range(values.shape[2]):
+                rhs[:,k]+=self.plan.assemblevector(Fe[:,:,k],elements)
+        nodal=self.massfactor.solve(rhs)
+        if scalar:
+            return nodal[:,0]
+        return nodal
+    def recover(self,disp,method='average'):
+        """
+        recover the nodal strain, stress and von mises stress
+
+        Parameters
+        ----------
+        disp : array
+            the displacement vector
+        method : string
+            'average' for the nodal averaging, 'l2' for the L2 projection
+
+        Returns
+        -------
+        solution : array
+            the nodal values ordered node by node, it can be saved by ResultIO with varnamelist
+        varnamelist : list
+            ['exx','eyy','exy','sxx','syy','sxy','vonMises']
+        """
+        strain=self.gpstrain(disp)
+        stress=self.gpstress(strain)
+        gpvalues=np.concatenate((strain,stress,self.vonmises(stress)[:,:,None]),axis=2)
+        gpvalues[:,:,2]*=0.5 # tensor shear strain exy
+        if method=='average':
+            nodal=self.nodalaverage(gpvalues)
+        elif method=='l2':
+            nodal=self.l2projection(gpvalues)
+        else:
+            sys.exit('unsupported recovery method (%s), please use average or l2'%(method))
+        return nodal.ravel(),self.varnamelist
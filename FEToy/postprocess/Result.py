@@ -8,7 +8,15 @@ __date__ = "April 15, 2022"
 
 
 import numpy as np
+import base64
+import gzip
+import os
+import zlib
 import sys
+try:
+    import h5py
+except ImportError:
+    h5py=None
 
 class ResultIO:
     def __init__(self,prefixname=''):
@@ -24,7 +32,10 @@ class ResultIO:
         self.filename=''
         if len(prefixname)<1:
             self.prefixname='myresult'
-    def save2csv(self,mesh,solution,varnamelist,step):
+        self.blocksize=32768 # the block size(in bytes) of the zlib compressed vtu data
+        self.compresslevel=6
+        self.csvchunk=65536 # the number of rows formatted in one write call of the csv file
+    def save2csv(self,mesh,solution,varnamelist,step,nodeids=None,stride=1,compress=False):
         """
         Save results to csv file
 
@@ -38,12 +49,22 @@ class ResultIO:
             the name list of your dofs
         step : int
             the current time step
+        nodeids : array
+            the ids of the nodes to be written(i.e. the probe points), all the nodes are used if it is None
+        stride : int
+            write every stride-th node of the selected nodes
+        compress : boolean
+            True to write the gzip compressed file(.csv.gz)
         """
         if not mesh.nodes*len(varnamelist)==len(solution):
             sys.exit('your varnamelist length*nodes does not match with your solution!')
         filename='%06d.csv'%(step)
         self.filename=self.prefixname+'-'+filename
-        inp=open(self.filename,'w+')
+        if compress:
+            self.filename+='.gz'
+            inp=gzip.open(self.filename,'wt',compresslevel=self.compresslevel)
+        else:
+            inp=open(self.filename,'w+')
         str=''
         if mesh.dim==1:
             str='x'
@@ -53,25 +74,23 @@ class ResultIO:
                 str+=','+i
         str+='\n'
         inp.write(str)
+
+        # one row per node: coordinates followed by the dofs of the node
         nodedofs=len(varnamelist)
-        for i in range(mesh.nodes):
-            if mesh.dim==1:
-                x=mesh.nodecoords[i]
-                str='%14.5e'%(x)
-            elif mesh.dim==2:
-                x=mesh.nodecoords[i,0]
-                y=mesh.nodecoords[i,1]
-                str='%14.5e,%14.5e'%(x,y)
-            for j in range(nodedofs):
-                iInd=i*nodedofs+j
-                str+=',%14.5e'%(solution[iInd])
-            str+='\n'
-            inp.write(str)
+        coords=np.asarray(mesh.nodecoords,dtype=np.float64).reshape((mesh.nodes,-1))
+        table=np.hstack((coords,np.asarray(solution,dtype=np.float64).reshape((mesh.nodes,nodedofs))))
+        if nodeids is not None:
+            table=table[np.asarray(nodeids)]
+        table=table[::stride]
+        rowformat=','.join(['%14.5e']*table.shape[1])+'\n'
+        for start in range(0,table.shape[0],self.csvchunk):
+            chunk=table[start:start+self.csvchunk]
+            inp.write((rowformat*chunk.shape[0])%tuple(chunk.ravel()))
 
         inp.close()
         print('write result to %s'%(self.filename))
 
-    def save2vtu(self,mesh,solution,varnamelist,step):
+    def save2vtu(self,mesh,solution,varnamelist,step,format='ascii',compress=False):
         """
         Save results to vtu file
 
@@ -85,13 +104,38 @@ class ResultIO:
             the name list of your dofs
         step : int
             the current time step
+        format : string
+            'ascii', 'binary'(base64 encoded inline data) or 'appended'(raw appended data)
+        compress : boolean
+            True to compress the binary/appended data with zlib
         """
         if not mesh.nodes*len(varnamelist)==len(solution):
             sys.exit('your varnamelist length*nodes dose not match with your solution!')
         filename='%06d.vtu'%(step)
         self.filename=self.prefixname+'-'+filename
+        if format=='ascii':
+            self.writevtuascii(mesh,solution,varnamelist)
+        elif format=='binary' or format=='appended':
+            self.writevtubinary(mesh,solution,varnamelist,format,compress)
+        else:
+            sys.exit('unsupported vtu format(%s), it should be ascii, binary or appended'%(format))
+
+        print('write result to %s'%(self.filename))
+    def vtuinttype(self,mesh):
+        """
+        return the vtk integer type of the connectivity and offsets,
+        Int64 is only needed once the node ids or the offsets go beyond 2^31
+        """
+        if max(mesh.nodes,mesh.elements*mesh.nodesperelement)>=np.iinfo(np.int32).max:
+            return 'Int64'
+        return 'Int32'
+    def writevtuascii(self,mesh,solution,varnamelist):
+        """
+        write the vtu file in ascii format
+        """
         inp=open(self.filename,'w+')
         vtkcelltype=mesh.vtkcelltype
+        inttype=self.vtuinttype(mesh)
 
         inp.write("<?xml version=\"1.0\"?>\n")
         inp.write("<VTKFile type=\"UnstructuredGrid\" version=\"1.0\">\n")
@@ -117,7 +161,7 @@ class ResultIO:
 
         # write out cell info
         inp.write("<Cells>\n")
-        inp.write("<DataArray type=\"Int32\" Name=\"connectivity\" NumberOfComponents=\"1\" format=\"ascii\">\n")
+        inp.write("<DataArray type=\"%s\" Name=\"connectivity\" NumberOfComponents=\"1\" format=\"ascii\">\n"%(inttype))
         for e in range(mesh.elements):
             str=''
             for i in range(mesh.nodesperelement):
@@ -126,7 +170,7 @@ class ResultIO:
             inp.write(str)
         inp.write("</DataArray>\n")
 
-        inp.write("<DataArray type=\"Int32\" Name=\"offsets\" NumberOfComponents=\"1\" format=\"ascii\">\n")
+        inp.write("<DataArray type=\"%s\" Name=\"offsets\" NumberOfComponents=\"1\" format=\"ascii\">\n"%(inttype))
         offset=0
         for e in range(mesh.elements):
             offset+=mesh.nodesperelement
@@ -165,5 +209,274 @@ class ResultIO:
         inp.write("</VTKFile>")
 
         inp.close()
+    ###########################################################
+    def encodevtuarray(self,data,format,compress):
+        """
+        encode one array for the binary(base64) or appended(raw) vtu format, the UInt64 header is used
+
+        Parameters
+        ----------
+        data : numpy array
+            the array to be written
+        format : string
+            'binary' or 'appended'
+        compress : boolean
+            True to compress the data with zlib, the data is split into blocks of self.blocksize bytes
+        """
+        raw=memoryview(np.ascontiguousarray(data)).cast('B')
+        if compress:
+            bs=self.blocksize
+            nblocks=(len(raw)+bs-1)//bs
+            blocks=[zlib.compress(raw[i*bs:(i+1)*bs],self.compresslevel) for i in range(nblocks)]
+            # [number of blocks, block size, size of the last partial block, compressed size of each block]
+            header=np.array([nblocks,bs,len(raw)%bs]+[len(block) for block in blocks],dtype=np.uint64).tobytes()
+            body=b''.join(blocks)
+            if format=='binary':
+                return base64.b64encode(header)+base64.b64encode(body)
+            return header+body
+        header=np.array([len(raw)],dtype=np.uint64).tobytes()
+        if format=='binary':
+            return base64.b64encode(header+raw)
+        return header+raw
+    def vtugeometryarrays(self,mesh):
+        """
+        return the (section,vtk type,name,components,array) list of the Points and Cells arrays
+        """
+        inttype=self.vtuinttype(mesh)
+        itype=np.int32 if inttype=='Int32' else np.int64
+        points=np.zeros((mesh.nodes,3))
+        if mesh.dim==1:
+            points[:,0]=mesh.nodecoords
+        elif mesh.dim==2:
+            points[:,:2]=mesh.nodecoords
+        offsets=np.arange(1,mesh.elements+1,dtype=itype)*mesh.nodesperelement
+        types=np.full(mesh.elements,mesh.vtkcelltype,dtype=np.uint8)
+        arrays=[('Points','Float64','nodes',3,points),
+                ('Cells',inttype,'connectivity',1,np.asarray(mesh.elementconn,dtype=itype)),
+                ('Cells',inttype,'offsets',1,offsets),
+                ('Cells','UInt8','types',1,types)]
+        return arrays
+    def vtupointdataarrays(self,mesh,solution,varnamelist):
+        """
+        return the (section,vtk type,name,components,array) list of the PointData arrays
+        """
+        arrays=[]
+        sol=np.asarray(solution,dtype=np.float64).reshape((mesh.nodes,len(varnamelist)))
+        for j in range(len(varnamelist)):
+            arrays.append(('PointData','Float64',varnamelist[j],1,sol[:,j]))
+        return arrays
+    def encodevtugeometry(self,mesh,format,compress):
+        """
+        return the (section,vtk type,name,components,encoded data) list of the Points and Cells arrays
+        """
+        geometry=[]
+        for array in self.vtugeometryarrays(mesh):
+            geometry.append(array[:4]+(self.encodevtuarray(array[4],format,compress),))
+        return geometry
+    def writevtubinary(self,mesh,solution,varnamelist,format,compress,geometry=None):
+        """
+        write the vtu file with the base64 encoded inline data(binary) or the raw appended data(appended)
+
+        Parameters
+        ----------
+        geometry : list
+            the encoded Points and Cells arrays(see encodevtugeometry), they are encoded here if it is None
+        """
+        if geometry is None:
+            geometry=self.encodevtugeometry(mesh,format,compress)
+        pointdata=self.vtupointdataarrays(mesh,solution,varnamelist)
+        arrays=[array[:4] for array in geometry]+[array[:4] for array in pointdata]
+        encoded=[array[4] for array in geometry]+[self.encodevtuarray(array[4],format,compress) for array in pointdata]
+
+        byteorder='LittleEndian' if sys.byteorder=='little' else 'BigEndian'
+        str="<?xml version=\"1.0\"?>\n"
+        str+="<VTKFile type=\"UnstructuredGrid\" version=\"1.0\" byte_order=\"%s\" header_type=\"UInt64\""%(byteorder)
+        if compress:
+            str+=" compressor=\"vtkZLibDataCompressor\""
+        str+=">\n"
+        str+="<UnstructuredGrid>\n"
+        str+="<Piece NumberOfPoints=\"%d\" NumberOfCells=\"%d\">\n"%(mesh.nodes,mesh.elements)
+
+        inp=open(self.filename,'wb')
+        inp.write(str.encode())
+        section='';offset=0
+        for array,data in zip(arrays,encoded):
+            if not array[0]==section:
+                if len(section)>0:
+                    inp.write(("</%s>\n"%(section)).encode())
+                section=array[0]
+                if section=='PointData':
+                    inp.write(("<PointData Scalar=\"%s \" >\n"%(' '.join(varnamelist))).encode())
+                else:
+                    inp.write(("<%s>\n"%(section)).encode())
+            str="<DataArray type=\"%s\" Name=\"%s\" NumberOfComponents=\"%d\" format=\"%s\""%(array[1],array[2],array[3],format)
+            if format=='appended':
+                inp.write((str+" offset=\"%d\"/>\n"%(offset)).encode())
+                offset+=len(data)
+            else:
+                inp.write((str+">\n").encode())
+                inp.write(data)
+                inp.write(b"\n</DataArray>\n")
+        inp.write(("</%s>\n"%(section)).encode())
+        inp.write(b"</Piece>\n</UnstructuredGrid>\n")
+        if format=='appended':
+            inp.write(b"<AppendedData encoding=\"raw\">\n_")
+            for data in encoded:
+                inp.write(data)
+            inp.write(b"\n</AppendedData>\n")
+        inp.write(b"</VTKFile>")
+        inp.close()
+###########################################################################
+class ResultSeries(ResultIO):
+    def __init__(self,mesh,varnamelist,prefixname='',format='appended',compress=False):
+        """
+        Initialize the time series writer, two layouts are supported:
+
+        'binary'/'appended': each step is saved to one vtu file and all of them are collected in the
+        prefixname.pvd file together with their physical time. The vtu format can not refer to the
+        geometry of another file, so the Points and Cells arrays are encoded once but still written
+        to every step.
 
-        print('write result to %s'%(self.filename))
\ No newline at end of file
+        'xdmf': the geometry is written only once into prefixname.h5, each step only appends its
+        point data to the same file, and the prefixname.xdmf temporal collection lets all the steps
+        refer to the shared geometry(h5py is required).
+
+        Parameters
+        ----------
+        mesh : mesh class
+            the mesh class, it must not change during the time series
+        varnamelist : list
+            the name list of your dofs
+        prefixname : string
+            the name of the output files(only prefix)
+        format : string
+            'binary', 'appended' or 'xdmf'
+        compress : boolean
+            True to compress the data with zlib(gzip filter of HDF5 for xdmf)
+        """
+        ResultIO.__init__(self,prefixname)
+        if not (format=='binary' or format=='appended' or format=='xdmf'):
+            sys.exit('unsupported format(%s) for ResultSeries, it should be binary, appended or xdmf'%(format))
+        if format=='xdmf' and h5py is None:
+            sys.exit('h5py is not installed, please use the binary or appended format for ResultSeries')
+        self.mesh=mesh
+        self.varnamelist=varnamelist
+        self.format=format
+        self.compress=compress
+        self.geometry=None
+        self.pvdname=self.prefixname+'.pvd'
+        self.h5name=self.prefixname+'.h5'
+        self.xdmfname=self.prefixname+'.xdmf'
+        self.collection=[] # (time,filename) of each step, (time,group name) for xdmf
+    def save(self,solution,step,time):
+        """
+        save the solution of one step and update the pvd(or xdmf) collection
+
+        Parameters
+        ----------
+        solution : numpy array
+            the solution of each node
+        step : int
+            the current time step
+        time : double
+            the physical time of the current step
+        """
+        mesh=self.mesh
+        if not mesh.nodes*len(self.varnamelist)==len(solution):
+            sys.exit('your varnamelist length*nodes dose not match with your solution!')
+        if self.format=='xdmf':
+            self.savehdf5(solution,step,time)
+            return
+        if self.geometry is None:
+            self.geometry=self.encodevtugeometry(mesh,self.format,self.compress)
+        self.filename=self.prefixname+'-%06d.vtu'%(step)
+        self.writevtubinary(mesh,solution,self.varnamelist,self.format,self.compress,self.geometry)
+        self.collection.append((time,self.filename))
+        self.writepvd()
+        print('write result to %s'%(self.filename))
+    def savehdf5(self,solution,step,time):
+        """
+        append the point data of one step to prefixname.h5, the geometry is written by the first step only
+        """
+        mesh=self.mesh
+        options={'compression':'gzip','compression_opts':self.compresslevel} if self.compress else {}
+        group='step-%06d'%(step)
+        if self.geometry is None:
+            f=h5py.File(self.h5name,'w')
+            points=np.zeros((mesh.nodes,3))
+            if mesh.dim==1:
+                points[:,0]=mesh.nodecoords
+            else:
+                points[:,:2]=mesh.nodecoords
+            f.create_dataset('mesh/points',data=points,**options)
+            f.create_dataset('mesh/cells',data=np.asarray(mesh.elementconn,dtype=np.int64),**options)
+            self.geometry=True
+        else:
+            f=h5py.File(self.h5name,'a')
+        if group in f:
+            del f[group]
+        sol=np.asarray(solution,dtype=np.float64).reshape((mesh.nodes,len(self.varnamelist)))
+        for j in range(len(self.varnamelist)):
+            f.create_dataset(group+'/'+self.varnamelist[j],data=sol[:,j],**options)
+        f.close()
+        self.filename=self.h5name
+        self.collection=[(t,g) for t,g in self.collection if not g==group]+[(time,group)]
+        self.writexdmf()
+        print('write result of step %d to %s'%(step,self.h5name))
+    def xdmftopology(self):
+        """
+        return the xdmf topology type of the mesh, the node ordering of mesh.elementconn is the vtk one
+        """
+        mesh=self.mesh
+        if mesh.dim==1:
+            return 'Polyline'
+        if mesh.nodesperelement==4:
+            return 'Quadrilateral'
+        if mesh.nodesperelement==9:
+            return 'Quadrilateral_9'
+        sys.exit('unsupported mesh type(%s) for the xdmf output'%(mesh.meshtype))
+    def writexdmf(self):
+        """
+        write the xdmf temporal collection, all the steps refer to the same geometry datasets of the h5 file,
+        it is rewritten at each step so it stays valid if the run stops
+        """
+        mesh=self.mesh
+        h5name=os.path.relpath(os.path.abspath(self.h5name),os.path.dirname(os.path.abspath(self.xdmfname)))
+        inp=open(self.xdmfname,'w+')
+        inp.write("<?xml version=\"1.0\"?>\n")
+        inp.write("<Xdmf Version=\"3.0\" xmlns:xi=\"http://www.w3.org/2001/XInclude\">\n<Domain>\n")
+        # the shared geometry, each step refers to it by xpointer
+        inp.write("<Grid Name=\"mesh\" GridType=\"Uniform\">\n")
+        inp.write("<Topology TopologyType=\"%s\" NumberOfElements=\"%d\" NodesPerElement=\"%d\">\n"%(self.xdmftopology(),mesh.elements,mesh.nodesperelement))
+        inp.write("<DataItem Dimensions=\"%d %d\" NumberType=\"Int\" Precision=\"8\" Format=\"HDF\">%s:/mesh/cells</DataItem>\n"%(mesh.elements,mesh.nodesperelement,h5name))
+        inp.write("</Topology>\n")
+        inp.write("<Geometry GeometryType=\"XYZ\">\n")
+        inp.write("<DataItem Dimensions=\"%d 3\" NumberType=\"Float\" Precision=\"8\" Format=\"HDF\">%s:/mesh/points</DataItem>\n"%(mesh.nodes,h5name))
+        inp.write("</Geometry>\n</Grid>\n")
+        inp.write("<Grid Name=\"series\" GridType=\"Collection\" CollectionType=\"Temporal\">\n")
+        for time,group in self.collection:
+            inp.write("<Grid Name=\"%s\" GridType=\"Uniform\">\n"%(group))
+            inp.write("<xi:include xpointer=\"xpointer(/Xdmf/Domain/Grid[@Name='mesh']/*[self::Topology or self::Geometry])\"/>\n")
+            inp.write("<Time Value=\"%.15e\"/>\n"%(time))
+            for name in self.varnamelist:
+                inp.write("<Attribute Name=\"%s\" AttributeType=\"Scalar\" Center=\"Node\">\n"%(name))
+                inp.write("<DataItem Dimensions=\"%d\" NumberType=\"Float\" Precision=\"8\" Format=\"HDF\">%s:/%s/%s</DataItem>\n"%(mesh.nodes,h5name,group,name))
+                inp.write("</Attribute>\n")
+            inp.write("</Grid>\n")
+        inp.write("</Grid>\n</Domain>\n</Xdmf>")
+        inp.close()
+    def writepvd(self):
+        """
+        write the pvd collection file, it is rewritten at each step so it stays valid if the run stops
+        """
+        pvddir=os.path.dirname(os.path.abspath(self.pvdname))
+        inp=open(self.pvdname,'w+')
+        inp.write("<?xml version=\"1.0\"?>\n")
+        inp.write("<VTKFile type=\"Collection\" version=\"0.1\">\n")
+        inp.write("<Collection>\n")
+        for time,filename in self.collection:
+            filename=os.path.relpath(os.path.abspath(filename),pvddir)
+            inp.write("<DataSet timestep=\"%.15e\" group=\"\" part=\"0\" file=\"%s\"/>\n"%(time,filename))
+        inp.write("</Collection>\n")
+        inp.write("</VTKFile>")
+        inp.close()
@@ -19,4 +19,4 @@ THE SOFTWARE.
 """
 
 
-__all__=["PlotResult","Result"]
+__all__=["PlotResult","Result","Checkpoint","AsyncResult","Recovery"]
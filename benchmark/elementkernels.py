@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the element kernels in FEToy
+The numpy(batched einsum) and the numba(compiled, parallel) backends of FEToy.fe.kernels are
+compared for the jacobian mapping and the poisson, diffusion and elasticity element matrices.
+The numba backend is skipped if numba is not installed, its compilation is not timed.
+usage: python benchmark/elementkernels.py [max number of elements]
+"""
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from FEToy.mesh.lagrange2dmesh import mesh2d
+from FEToy.fe.shapefun import shape2d
+from FEToy.fe.gaussrule import gausspoint2d
+from FEToy.fe.elasticity import elasticitymatrix
+from FEToy.fe import kernels
+
+def timeit(func,repeat=3):
+    t=np.inf
+    for i in range(repeat):
+        start=time.perf_counter()
+        func()
+        t=min(t,time.perf_counter()-start)
+    return t
+
+def main():
+    maxelements=10**6
+    if len(sys.argv)>1:
+        maxelements=int(float(sys.argv[1]))
+
+    backends=['numpy']
+    if kernels.njit is not None:
+        backends.append('numba')
+    else:
+        print('numba is not installed, only the numpy backend is timed')
+
+    D=elasticitymatrix(1.0e9,0.3)
+    tests={'jacobian'  :lambda m,s,g:kernels.mapgradients(m.nodecoords,m.elementconn,s,g),
+           'poisson'   :lambda m,s,g:kernels.stiffnessmatrices(m.nodecoords,m.elementconn,s,g),
+           'diffusion' :lambda m,s,g:kernels.diffusionmatrices(m.nodecoords,m.elementconn,s,g,0.5,1.0e-2),
+           'elasticity':lambda m,s,g:kernels.elasticitymatrices(m.nodecoords,m.elementconn,s,g,D)}
+
+    print('%10s %8s %12s'%('elements','type','kernel')+''.join(['%14s'%(b+'(s)') for b in backends])+'%10s'%('speedup'))
+    for n in [10**5,10**6]:
+        if n>maxelements:
+            break
+        nx=int(np.sqrt(n));ny=n//nx
+        for meshtype,ngp in [('quad4',2),('quad9',3)]:
+            mesh=mesh2d(nx=nx,ny=ny,meshtype=meshtype)
+            mesh.createmesh()
+            shp=shape2d(meshtype=meshtype)
+            shp.update()
+            gpoints=gausspoint2d(ngp=ngp)
+            gpoints.creategausspoint()
+            for name,func in tests.items():
+                times=[]
+                for backend in backends:
+                    kernels.setbackend(backend)
+                    if backend=='numba':
+                        func(mesh,shp,gpoints) # compile
+                    times.append(timeit(lambda:func(mesh,shp,gpoints),repeat=1 if n>=10**6 else 3))
+                str='%10d %8s %12s'%(mesh.elements,meshtype,name)+''.join(['%14.4e'%(t) for t in times])
+                if len(times)>1:
+                    str+='%10.1f'%(times[0]/times[1])
+                print(str)
+            del mesh
+    kernels.setbackend('auto')
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the matrix-free operator in FEToy
+The poisson operator of the quad4/quad9 mesh is applied by the assembled csr matrix(SpMV) and by the
+sum factorization of FEToy.fe.matrixfree(numpy and numba backends). The setup time(assembly or
+geometry), the time of one y=K*u and the memory of the operator are reported.
+usage: python benchmark/matrixfree.py [max number of nodes]
+"""
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from FEToy.mesh.lagrange2dmesh import mesh2d
+from FEToy.fe.shapefun import shape2d
+from FEToy.fe.gaussrule import gausspoint2d
+from FEToy.fe.assembler import assemblyplan
+from FEToy.fe.matrixfree import sumfactoperator
+from FEToy.fe import kernels
+
+def timeit(func,repeat=10):
+    t=np.inf
+    for i in range(repeat):
+        start=time.perf_counter()
+        func()
+        t=min(t,time.perf_counter()-start)
+    return t
+
+def main():
+    maxnodes=4*10**6
+    if len(sys.argv)>1:
+        maxnodes=int(float(sys.argv[1]))
+
+    backends=['numpy']
+    if kernels.njit is not None:
+        backends.append('numba')
+    else:
+        print('numba is not installed, only the numpy backend is timed')
+
+    print('%10s %8s %10s %12s %12s %12s'%('nodes','type','operator','setup(s)','apply(s)','memory(MB)'))
+    for n in [10**5,10**6,4*10**6]:
+        if n>maxnodes:
+            break
+        for meshtype,ngp in [('quad4',2),('quad9',3)]:
+            p=1 if meshtype=='quad4' else 2
+            nx=int(np.sqrt(n))//p
+            mesh=mesh2d(nx=nx,ny=nx,meshtype=meshtype)
+            mesh.createmesh()
+            mesh.uniform=False # store the geometry of all the elements
+            shp=shape2d(meshtype=meshtype)
+            shp.update()
+            gpoints=gausspoint2d(ngp=ngp)
+            gpoints.creategausspoint()
+            u=np.random.default_rng(0).random(mesh.nodes)
+
+            kernels.setbackend('numpy')
+            start=time.perf_counter()
+            plan=assemblyplan(mesh)
+            K=plan.creatematrix(plan.assemblematrix(kernels.stiffnessmatrices(mesh.nodecoords,mesh.elementconn,shp,gpoints)))
+            setup=time.perf_counter()-start
+            memory=(K.data.nbytes+K.indices.nbytes+K.indptr.nbytes)/1.0e6
+            print('%10d %8s %10s %12.4e %12.4e %12.2f'%(mesh.nodes,meshtype,'csr',setup,timeit(lambda:K@u),memory))
+            y=K@u
+            del K,plan
+            for backend in backends:
+                kernels.setbackend(backend)
+                start=time.perf_counter()
+                op=sumfactoperator(mesh)
+                setup=time.perf_counter()-start
+                op.apply(u) # compile
+                if not np.allclose(op.apply(u),y,atol=1.0e-10):
+                    sys.exit('the matrix-free operator does not match with the assembled matrix')
+                print('%10d %8s %10s %12.4e %12.4e %12.2f'%(mesh.nodes,meshtype,'mf-'+backend,setup,timeit(lambda:op.apply(u)),op.getmemory()/1.0e6))
+            del mesh,op
+    kernels.setbackend('auto')
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the mesh generation in FEToy
+The vectorized mesh2d.createmesh is compared with the former nested-loop
+generator(quad4 only), which is kept below as the reference.
+usage: python benchmark/meshgeneration.py [max number of elements] [max number of elements for the loop generator]
+"""
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from FEToy.mesh.lagrange1dmesh import mesh1d
+from FEToy.mesh.lagrange2dmesh import mesh2d
+
+def loopquad4(nx,ny):
+    """
+    the former loop-based quad4 generator(nodes and element connectivity only)
+    """
+    nodecoords=np.zeros(((nx+1)*(ny+1),2))
+    elementconn=np.zeros((nx*ny,4),dtype=np.int64)
+    dx=1.0/nx;dy=1.0/ny
+    for j in range(ny+1):
+        for i in range(nx+1):
+            k=j*(nx+1)+i
+            nodecoords[k,0]=i*dx
+            nodecoords[k,1]=j*dy
+    for j in range(1,ny+1):
+        for i in range(1,nx+1):
+            e=(j-1)*nx+i-1
+            i1=(j-1)*(nx+1)+i
+            elementconn[e,:]=[i1-1,i1,i1+nx+1,i1+nx]
+    return nodecoords,elementconn
+
+def timeit(func,repeat=3):
+    t=np.inf
+    for i in range(repeat):
+        start=time.perf_counter()
+        func()
+        t=min(t,time.perf_counter()-start)
+    return t
+
+if __name__=='__main__':
+    maxelements=10**7
+    if len(sys.argv)>1:
+        maxelements=int(float(sys.argv[1]))
+    maxloop=10**6
+    if len(sys.argv)>2:
+        maxloop=int(float(sys.argv[2]))
+
+    print('%10s %8s %14s %14s %10s'%('elements','type','vectorized(s)','loop(s)','speedup'))
+    for n in [10**4,10**5,10**6,10**7]:
+        if n>maxelements:
+            break
+        nx=int(np.sqrt(n));ny=n//nx
+        for meshtype in ['quad4','quad9']:
+            mesh=mesh2d(nx=nx,ny=ny,meshtype=meshtype)
+            tvec=timeit(mesh.createmesh,repeat=1 if n>=10**7 else 3)
+            if meshtype=='quad4' and n<=maxloop:
+                tloop=timeit(lambda:loopquad4(nx,ny),repeat=1)
+                print('%10d %8s %14.4e %14.4e %10.1f'%(nx*ny,meshtype,tvec,tloop,tloop/tvec))
+            else:
+                print('%10d %8s %14.4e %14s %10s'%(nx*ny,meshtype,tvec,'-','-'))
+            del mesh
+        mesh=mesh1d(nx=n,meshtype='edge3')
+        print('%10d %8s %14.4e %14s %10s'%(n,'edge3',timeit(mesh.createmesh),'-','-'))
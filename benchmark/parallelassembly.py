@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the process-pool assembly in FEToy
+The residual and the jacobian of the nonlinear poisson equation(6-NewtonRaphson) are assembled
+on a quad4 mesh with 1,2,4,...,32 worker processes, the strong scaling is reported w.r.t 1 worker.
+usage: python benchmark/parallelassembly.py [number of elements] [max number of workers]
+"""
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from FEToy.mesh.lagrange2dmesh import mesh2d
+from FEToy.fe.shapefun import shape2d
+from FEToy.fe.gaussrule import gausspoint2d
+from FEToy.fe.parallel import parallelassembler
+
+class poissonkernel:
+    """
+    R=int(sigma(phi)*grad(phi)*grad(N)+f(phi)*N), K=-dR/dphi, with sigma=1+exp(phi), f=1+0.1*phi
+    """
+    def residual(self,qp):
+        w=qp.JxW
+        return np.einsum('eq,eqd,eqid->ei',(1.0+np.exp(qp.u))*w,qp.gradu,qp.shape_grad)\
+              +np.einsum('eq,eqi->ei',(1.0+0.1*qp.u)*w,qp.shape_val)
+    def jacobian(self,qp):
+        w=qp.JxW
+        K=-np.einsum('eq,eqj,eqd,eqid->eij',np.exp(qp.u)*w,qp.shape_val,qp.gradu,qp.shape_grad)
+        K-=np.einsum('eq,eqjd,eqid->eij',(1.0+np.exp(qp.u))*w,qp.shape_grad,qp.shape_grad)
+        K-=np.einsum('eq,eqj,eqi->eij',0.1*w,qp.shape_val,qp.shape_val)
+        return K
+
+if __name__=='__main__':
+    n=10**6
+    if len(sys.argv)>1:
+        n=int(float(sys.argv[1]))
+    maxworkers=32
+    if len(sys.argv)>2:
+        maxworkers=int(sys.argv[2])
+    nx=int(np.sqrt(n));ny=n//nx
+    mesh=mesh2d(nx=nx,ny=ny,meshtype='quad4')
+    mesh.createmesh()
+    shp=shape2d(meshtype='quad4')
+    shp.update()
+    gpoints=gausspoint2d(ngp=2)
+    gpoints.creategausspoint()
+    U=np.random.default_rng(0).random(mesh.nodes)
+
+    print('elements=%d, cpus=%d'%(mesh.elements,os.cpu_count()))
+    print('%8s %14s %10s %12s'%('workers','time(s)','speedup','efficiency'))
+    t1=None
+    workers=1
+    while workers<=maxworkers:
+        with parallelassembler(mesh,shp,gpoints,workers=workers) as assembler:
+            assembler.assemble(poissonkernel(),U) # warm up the workers
+            t=np.inf
+            for i in range(3):
+                start=time.perf_counter()
+                K,R=assembler.assemble(poissonkernel(),U)
+                t=min(t,time.perf_counter()-start)
+        if t1 is None:
+            t1=t
+        print('%8d %14.4e %10.2f %12.2f'%(workers,t,t1/t,t1/t/workers))
+        workers*=2
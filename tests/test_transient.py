@@ -0,0 +1,49 @@
+import numpy as np
+from FEToy.mesh.lagrange2dmesh import mesh2d
+from FEToy.fe.shapefun import shape2d
+from FEToy.fe.gaussrule import gausspoint2d
+from FEToy.fe.dirichletbc import dirichletbc
+from FEToy.fe.transient import lineartransient
+
+
+def createdriver(bcsides,D=1.0):
+    mesh=mesh2d(nx=8,ny=6,meshtype='quad4')
+    mesh.createmesh()
+    shp=shape2d('quad4');shp.update()
+    gpoints=gausspoint2d(ngp=2);gpoints.creategausspoint()
+    bc=dirichletbc(mesh.nodes)
+    for side,value in bcsides:
+        bc.addbc(mesh.bcnodeids[side],value)
+    return mesh,bc,lineartransient(mesh,shp,gpoints,D=D,dt=1.0e-2,bc=bc)
+
+
+def test_addbc_between_steps():
+    mesh,bc,driver=createdriver([('left',0.0)])
+    c=driver.step(np.zeros(mesh.nodes))[0]
+    bc.addbc(mesh.bcnodeids['right'],1.0)
+    c1=driver.step(c)[0]
+    _,_,reference=createdriver([('left',0.0),('right',1.0)])
+    c2=reference.step(c)[0]
+    assert driver.factorizations==2
+    assert np.allclose(c1[mesh.bcnodeids['right']],1.0)
+    assert np.allclose(c1,c2)
+
+
+def test_change_D_between_steps():
+    mesh,bc,driver=createdriver([('left',0.0),('right',1.0)])
+    c=driver.step(np.zeros(mesh.nodes))[0]
+    driver.D=3.0
+    c1=driver.step(c)[0]
+    _,_,reference=createdriver([('left',0.0),('right',1.0)],D=3.0)
+    c2=reference.step(c)[0]
+    assert driver.factorizations==2
+    assert np.allclose(c1,c2)
+
+
+def test_setvalue_keeps_factorization():
+    mesh,bc,driver=createdriver([('left',0.0),('right',1.0)])
+    c=driver.step(np.zeros(mesh.nodes))[0]
+    bc.setvalue(mesh.bcnodeids['right'],2.0)
+    c=driver.step(c)[0]
+    assert driver.factorizations==1
+    assert np.allclose(c[mesh.bcnodeids['right']],2.0)